@@ -0,0 +1,153 @@
+import argparse, json, platform, random, sys, time, tracemalloc
+from Evaluators import EVALUATORS
+from GameSearch import GameSearch
+from MazeRunner import TurnBasedGame
+
+# seeded mazes, each searched from fixed start positions: max in the top-left corner
+# and min in the bottom-right one
+SCENARIOS = {
+    "10x10-perfect": {"size": 10, "loop_percent": 0, "seed": 1},
+    "10x10-loops": {"size": 10, "loop_percent": 100, "seed": 1},
+    "20x30-perfect": {"size": 20, "loop_percent": 0, "seed": 1},
+    "20x30-loops": {"size": 20, "loop_percent": 100, "seed": 1},
+}
+
+# node counts are deterministic, so any change is reported; timings and memory only
+# count as regressions beyond the tolerance, and searches faster than TIME_FLOOR
+# seconds are too noisy to time at all
+TIMED_FIELDS = ("seconds", "peak_kib")
+TIME_FLOOR = 0.005
+
+
+def build_game(scenario):
+    """the seeded headless game for one of SCENARIOS, with max to move."""
+    settings = SCENARIOS[scenario]
+    random.seed(settings["seed"])
+    game = TurnBasedGame(settings["size"], headless=True, loop_percent=settings["loop_percent"])
+    game.max.position = (1, 1)
+    game.min.position = (game.rows, game.cols)
+    game.current_player = game.max
+    return game
+
+
+def time_search(game, method, depth):
+    """runs one get_best_move from the game's current state and returns (nodes, seconds)."""
+    game.depth = depth
+    search = game.game_search
+    start = time.perf_counter()
+    search.get_best_move(alphaBeta=method == "AB", pvs=method == "PVS")
+    elapsed = time.perf_counter() - start
+    return search.node_counter, elapsed
+
+
+def measure(game, method, depth, tt_size, evaluator, repeat=1, memory=True):
+    """one benchmark record; the best of repeat timed runs, then an untimed run under tracemalloc."""
+    best = None
+    for _ in range(repeat):
+        game.game_search = GameSearch(game, tt_size=tt_size, evaluator=EVALUATORS[evaluator]())
+        nodes, elapsed = time_search(game, method, depth)
+        best = elapsed if best is None else min(best, elapsed)
+    search = game.game_search
+    record = {
+        "nodes": nodes,
+        "pruned": search.pruned_nodes,
+        "cutoffs": search.cutoffs,
+        "effective_branching_factor": search.last_stats.effective_branching_factor,
+        "seconds": best,
+        "nodes_per_sec": nodes / best if best else 0.0,
+    }
+    if memory:
+        game.game_search = GameSearch(game, tt_size=tt_size, evaluator=EVALUATORS[evaluator]())
+        tracemalloc.start()
+        try:
+            time_search(game, method, depth)
+            record["peak_kib"] = tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+    return record
+
+
+def run_suite(scenarios, methods, depths, tt_size=1 << 16, evaluators=("manhattan",), repeat=1, memory=True,
+              log=print):
+    """runs every combination and returns the results document written by --output."""
+    results = []
+    for scenario in scenarios:
+        game = build_game(scenario)
+        for evaluator in evaluators:
+            for method in methods:
+                for depth in depths:
+                    record = {"scenario": scenario, "evaluator": evaluator, "method": method, "depth": depth}
+                    record.update(measure(game, method, depth, tt_size, evaluator, repeat, memory))
+                    results.append(record)
+                    log(f"{scenario} {evaluator} {method} depth {depth}: {record['nodes']} nodes in "
+                        f"{record['seconds']:.3f}s ({record['nodes_per_sec']:,.0f} nodes/sec)")
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "tt_size": tt_size,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def record_key(record):
+    return record["scenario"], record["evaluator"], record["method"], record["depth"]
+
+
+def compare(baseline, current, tolerance=0.1):
+    """returns a list of regression messages for current against baseline.
+
+    node counts must match exactly; seconds and peak memory may grow by tolerance
+    (a fraction) before they count. runs missing from either side are skipped, as are
+    the timings of runs under TIME_FLOOR.
+    """
+    previous = {record_key(record): record for record in baseline["results"]}
+    regressions = []
+    for record in current["results"]:
+        old = previous.get(record_key(record))
+        if old is None:
+            continue
+        name = " ".join(str(part) for part in record_key(record))
+        if record["nodes"] != old["nodes"]:
+            regressions.append(f"{name}: nodes {old['nodes']} -> {record['nodes']}")
+        for field in TIMED_FIELDS:
+            if field not in record or field not in old or field == "seconds" and old[field] < TIME_FLOOR:
+                continue
+            if record[field] > old[field] * (1 + tolerance):
+                regressions.append(f"{name}: {field} {old[field]:.3f} -> {record[field]:.3f} "
+                                   f"(+{record[field] / old[field] - 1:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="measure search performance on seeded headless mazes")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=sorted(SCENARIOS))
+    parser.add_argument("--depths", type=int, nargs="+", default=[6, 9, 12])
+    parser.add_argument("--methods", nargs="+", choices=["MM", "AB", "PVS"], default=["MM", "AB"])
+    parser.add_argument("--tt-size", type=int, default=1 << 16, help="transposition table slots, 0 disables it")
+    parser.add_argument("--evaluators", nargs="+", choices=sorted(EVALUATORS), default=["manhattan"])
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per search, the fastest is kept")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak memory run")
+    parser.add_argument("--output", help="write the results as json to this file")
+    parser.add_argument("--baseline", help="compare against results from an earlier --output")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed slowdown before it is flagged")
+    args = parser.parse_args()
+
+    current = run_suite(args.scenarios, args.methods, args.depths, args.tt_size, args.evaluators,
+                        args.repeat, not args.no_memory)
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(current, handle, indent=2)
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        regressions = compare(baseline, current, args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+        print("no regressions against", args.baseline)
+
+
+if __name__ == "__main__":
+    main()
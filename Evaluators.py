@@ -0,0 +1,39 @@
+from collections import deque
+
+
+class ManhattanEvaluator:
+    """scores cells by manhattan distance to the goal, ignoring walls."""
+    name = "manhattan"
+
+    def distance_field(self, game):
+        goal = game.goal
+        return [abs(x - goal[0]) + abs(y - goal[1]) for x, y in game.cell_positions]
+
+
+class MazeDistanceEvaluator:
+    """scores cells by their true path length to the goal through the maze.
+
+    the field comes from a single breadth-first search outward from the goal over the
+    game's neighbor table. cells that cannot reach the goal get rows * cols.
+    """
+    name = "maze"
+
+    def distance_field(self, game):
+        unreachable = len(game.neighbors)
+        distances = [unreachable] * len(game.neighbors)
+        distances[game.goal_cell] = 0
+        frontier = deque([game.goal_cell])
+        while frontier:
+            cell = frontier.popleft()
+            next_distance = distances[cell] + 1
+            for neighbor in game.neighbors[cell]:
+                if distances[neighbor] == unreachable:
+                    distances[neighbor] = next_distance
+                    frontier.append(neighbor)
+        return distances
+
+
+EVALUATORS = {
+    ManhattanEvaluator.name: ManhattanEvaluator,
+    MazeDistanceEvaluator.name: MazeDistanceEvaluator,
+}
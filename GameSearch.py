@@ -1,135 +1,614 @@
+import hashlib, time
+from contextlib import contextmanager
+from Evaluators import ManhattanEvaluator
+from PositionCache import position_key
+from SearchStats import SearchStats, trim
+from TranspositionTable import ZobristKeys, TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+MAX_SEARCH_DEPTH = 64  # deepest iteration tried by the anytime search
+DEADLINE_CHECK_INTERVAL = 1024  # nodes between clock reads, must be a power of two
+ASPIRATION_WINDOW = 2  # half-width of the root window around the previous iteration's score
+
+# move ordering scores, history scores stay far below the killer score
+HASH_MOVE_SCORE = 1 << 62
+KILLER_MOVE_SCORE = 1 << 61
+DISTANCE_SCALE = 1 << 16  # history outranks goal distance, which only breaks history ties
+TABLEBASE_WIN = 1 << 20  # leaf value of a tablebase win, less the plies it takes
+
+
+def maze_fingerprint(game):
+    """sha1 digest (20 bytes) of the maze's size and neighbor table, the same for any copy of the maze."""
+    digest = hashlib.sha1(f"{game.rows}x{game.cols}".encode())
+    for cells in game.neighbors:
+        digest.update(bytes([len(cells)]))
+        digest.update(b"".join(cell.to_bytes(4, "little") for cell in sorted(cells)))
+    return digest.digest()
+
+
+class SearchTimeout(Exception):
+    """raised inside the search when the wall-clock budget runs out or the search is cancelled."""
+
+
+class Position:
+    """mutable search position, updated in place by make_move/unmake_move.
+
+    cells holds [max_cell, min_cell]; the cell a move replaces is kept in a per-ply
+    undo buffer so unmake_move restores it without allocating.
+    """
+    __slots__ = ('cells', 'max_to_move', 'undo')
+
+    def __init__(self, state, max_depth):
+        self.cells = [state[0], state[1]]
+        self.max_to_move = state[2]
+        self.undo = [0] * (max_depth + 1)
+
+    def make_move(self, move, ply):
+        side = 0 if self.max_to_move else 1
+        self.undo[ply] = self.cells[side]
+        self.cells[side] = move
+        self.max_to_move = not self.max_to_move
+
+    def unmake_move(self, ply):
+        self.max_to_move = not self.max_to_move
+        self.cells[0 if self.max_to_move else 1] = self.undo[ply]
+
+    def state(self):
+        return (self.cells[0], self.cells[1], self.max_to_move)
+
+
 class GameSearch:
-    def __init__(self, game):
+    def __init__(self, game, tt_size=1 << 16, evaluator=None, hooks=None):
         self.game = game
         self.node_counter = 0
         self.pruned_nodes = 0
         self.search_method = "MM"  # default to minimax
 
-    def minimax(self, state, depth, maximizingPlayer):
-        self.node_counter += 1
+        # the evaluator supplies a per-cell distance-to-goal field, cached per goal
+        self.evaluator = evaluator if evaluator is not None else ManhattanEvaluator()
+        self._distances = None
+        self._distances_goal = None
 
-        if depth == 0 or self.game.is_terminal(state):
-            heuristic_value = self.evaluate_state(state)
-            return heuristic_value
-
-        if maximizingPlayer:
-            maxEval = float('-inf')
-            best_move = None
-            possible_moves = self.game.get_possible_moves(self.game.max)
-            for move in sorted(possible_moves):
-                child_state = self.game.apply_move(state, move)
-                eval = self.minimax(child_state, depth - 1, False)
-                if eval > maxEval:
-                    maxEval = eval
-                    best_move = move
-                elif eval == maxEval and best_move is not None:
-                    best_move = self.break_tie(move, best_move)  # add a tie-breaking method here
-            if depth == self.game.depth:
-                return best_move
-            return maxEval
-        else:
-            minEval = float('inf')
-            best_move = None
-            possible_moves = self.game.get_possible_moves(self.game.min)
-            for move in sorted(possible_moves):
-                child_state = self.game.apply_move(state, move)
-                eval = self.minimax(child_state, depth - 1, True)
-                if eval < minEval:
-                    minEval = eval
-                    best_move = move
-                elif eval == minEval and best_move is not None:
-                    best_move = self.break_tie(move, best_move)
-            if depth == self.game.depth:
-                return best_move
-            return minEval
+        # transposition table used by alpha_beta_minimax, tt_size=0 turns it off
+        self.zobrist = ZobristKeys(game.rows * game.cols)
+        self.transposition_table = TranspositionTable(tt_size) if tt_size else None
+
+        # move ordering for alpha_beta_minimax: two killer moves per ply and a history
+        # table keyed by (from_cell * cells + to_cell) * 2 + side
+        self.killers = []
+        self.history = {}
+        self.move_buffers = []
+        self.score_buffers = []
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+        # per-search statistics, reset by get_best_move and summed up in last_stats
+        self.ply_nodes = []
+        self.cutoffs_per_ply = []
+        self.cutoff_indexes = [0, 0, 0, 0]
+        self.evaluations = 0
+        self.terminal_nodes = 0
+        self.iterations = []
+        self.last_stats = None
+        self.ensure_ply_buffers(MAX_SEARCH_DEPTH)
+
+        # principal variation search: null windows for all but the first child, set by get_best_move
+        self.null_window = False
+        self.root_value = None
+        self.root_move = None
+        self._root_expanded = False
+
+        # iterative deepening state, see get_best_move
+        self._root_depth = None
+        self.deadline = None
+        self.completed_depth = 0
+        self.cancelled = False  # set by cancel() from another thread, cleared by get_best_move
+
+        # optional external engine (RootSplitSearch, LazySMPSearch, BatchedSearch) that
+        # get_best_move hands its searches to
+        self.engine = None
+
+        # optional solved Tablebase for this maze, probed at the root and at leaves while
+        # the game's goal is the one it was solved for, see set_tablebase
+        self.tablebase = None
+        self._tablebase = None
+
+        # optional PositionCache of fixed-depth root results, consulted before searching
+        self.position_cache = None
+        self._fingerprint = (None, None)
+
+        # optional SearchHooks; attaching them swaps in traced_negamax for this instance
+        # so the plain kernel never checks for them
+        self.hooks = None
+        if hooks is not None:
+            self.attach_hooks(hooks)
+
+    @property
+    def root_depth(self):
+        """depth at which minimax/alpha_beta_minimax return a move instead of a value."""
+        return self.game.depth if self._root_depth is None else self._root_depth
+
+    def check_deadline(self):
+        if self.cancelled or self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+
+    def cancel(self):
+        """stops a get_best_move running on another thread at its next deadline check.
+
+        the abandoned search returns the move of its last completed iteration, None if
+        there was none, and is not written to the position cache. external engines
+        are not interrupted.
+        """
+        self.cancelled = True
+
+    def ensure_ply_buffers(self, depth):
+        """grows the per-ply killer and move buffers to cover plies 0..depth."""
+        while len(self.move_buffers) <= depth:
+            self.killers.append([None, None])
+            self.move_buffers.append([0, 0, 0, 0])
+            self.score_buffers.append([0, 0, 0, 0])
+            self.ply_nodes.append(0)
+            self.cutoffs_per_ply.append(0)
+
+    def minimax(self, state, depth, maximizingPlayer):
+        return self.search(state, depth, float('-inf'), float('inf'), False)
 
     def alpha_beta_minimax(self, state, depth, maximizingPlayer, alpha=float('-inf'), beta=float('inf')):
+        return self.search(state, depth, alpha, beta, True)
+
+    def search(self, state, depth, alpha, beta, pruning):
+        """runs the negamax kernel from state with (alpha, beta) seen from max's side.
+
+        returns the best move at the root depth, otherwise the value for max.
+        """
+        self.ensure_ply_buffers(depth)
+        self._root_expanded = False
+        self._tablebase = self.active_tablebase()
+        if not state[2]:
+            alpha, beta = -beta, -alpha
+        value = self.negamax(Position(state, depth), depth, 0, alpha, beta, pruning)
+        if depth == self.root_depth and self._root_expanded:
+            return self.root_move
+        return value if state[2] else -value
+
+    def attach_hooks(self, hooks):
+        """routes every node of this instance's searches through hooks, see SearchHooks."""
+        self.hooks = hooks
+        self.negamax = self.traced_negamax
+        self.record_cutoff = self.traced_record_cutoff
+
+    def detach_hooks(self):
+        """goes back to the uninstrumented kernel."""
+        self.hooks = None
+        self.__dict__.pop('negamax', None)
+        self.__dict__.pop('record_cutoff', None)
+
+    @contextmanager
+    def hooked(self, hooks):
+        """with search.hooked(TreeTracer("trace.jsonl")): ... traces the searches run inside."""
+        self.attach_hooks(hooks)
+        try:
+            yield hooks
+        finally:
+            self.detach_hooks()
+
+    def traced_negamax(self, position, depth, ply, alpha, beta, pruning):
+        """negamax with the hooks fired around it; the kernel's recursive calls come back here."""
+        hooks = self.hooks
+        state = position.state()
+        hooks.node_enter(state, depth, ply, alpha, beta)
+        nodes = self.node_counter
+        evaluations = self.evaluations
+        value = type(self).negamax(self, position, depth, ply, alpha, beta, pruning)
+        if self.evaluations != evaluations and not depth:
+            hooks.leaf(state, value)
+        hooks.node_exit(state, depth, ply, value, self.node_counter - nodes)
+        return value
+
+    def traced_record_cutoff(self, max_to_move, from_cell, move, ply, depth, index):
+        self.hooks.cutoff(max_to_move, from_cell, move, ply, depth, index)
+        type(self).record_cutoff(self, max_to_move, from_cell, move, ply, depth, index)
+
+    def search_value(self, state, depth, pruning=True):
+        """returns the value of state for max searched to depth, never a move."""
+        self.ensure_ply_buffers(depth)
+        self._tablebase = self.active_tablebase()
+        value = self.negamax(Position(state, depth), depth, 0, float('-inf'), float('inf'), pruning)
+        return value if state[2] else -value
+
+    def negamax(self, position, depth, ply, alpha, beta, pruning):
+        """shared search kernel, values are from the side to move's point of view.
+
+        pruning=False is plain minimax over the moves in cell order. pruning=True adds the
+        alpha-beta cutoffs, the transposition table, move ordering and, when
+        self.null_window is set, principal variation null windows.
+        """
         self.node_counter += 1
+        if not self.node_counter & (DEADLINE_CHECK_INTERVAL - 1):
+            self.check_deadline()
+        self.ply_nodes[ply] += 1
 
-        if depth == 0 or self.game.is_terminal(state):
-            heuristic_value = self.evaluate_state(state)
-            return heuristic_value
+        cells = position.cells
+        max_to_move = position.max_to_move
+        goal_cell = self.game.goal_cell
+        if cells[0] == goal_cell or cells[1] == goal_cell:
+            self.terminal_nodes += 1
+            # whoever stands on the goal has won, max first if both do
+            return float('inf') if (cells[0] == goal_cell) == max_to_move else float('-inf')
+        if depth == 0:
+            self.evaluations += 1
+            if self._tablebase is not None:
+                value = self._tablebase.probe((cells[0], cells[1], max_to_move))
+                if value:
+                    return self.tablebase_score(value)
+            distances = self._distances if self._distances_goal == goal_cell else self.goal_distances()
+            value = distances[cells[1]] - distances[cells[0]]
+            return value if max_to_move else -value
 
-        best_move = None
-        if maximizingPlayer:
-            maxEval = float('-inf')
-            possible_moves = self.get_possible_moves_sorted(state, self.game.max)
-            for move in possible_moves:
-                child_state = self.game.apply_move(state, move)
-                eval = self.alpha_beta_minimax(child_state, depth - 1, False, alpha, beta)
-                if eval > maxEval:
-                    maxEval = eval
-                    best_move = move
-                elif eval == maxEval and best_move is not None:
-                    best_move = self.break_tie(move, best_move)
-                alpha = max(alpha, eval)
-                if beta <= alpha:
-                    self.pruned_nodes += 1
-                    break
-            return best_move if depth == self.game.depth else maxEval
+        from_cell = cells[0] if max_to_move else cells[1]
+        table = self.transposition_table if pruning else None
+        hash_move = None
+        if table is not None:
+            key = self.zobrist.hash_cells(cells[0], cells[1], max_to_move, goal_cell)
+            entry = table.probe(key)
+            if entry is not None:
+                hash_move = entry[4]
+                if entry[1] >= depth and ply:
+                    value, bound = entry[2], entry[3]
+                    if bound == EXACT or (bound == LOWER_BOUND and value >= beta) or \
+                            (bound == UPPER_BOUND and value <= alpha):
+                        return value
+        alpha_orig = alpha
+
+        if pruning:
+            count = self.order_moves_into(max_to_move, from_cell, ply, hash_move)
+            moves = self.move_buffers[ply]
         else:
-            minEval = float('inf')
-            possible_moves = self.get_possible_moves_sorted(state, self.game.min)
-            for move in possible_moves:
-                child_state = self.game.apply_move(state, move)
-                eval = self.alpha_beta_minimax(child_state, depth - 1, True, alpha, beta)
-                if eval < minEval:
-                    minEval = eval
-                    best_move = move
-                elif eval == minEval and best_move is not None:
-                    best_move = self.break_tie(move, best_move)
-                beta = min(beta, eval)
+            moves = self.game.neighbors[from_cell]
+            count = len(moves)
+        null_window = pruning and self.null_window
+
+        best_value = float('-inf')
+        best_move = None
+        for index in range(count):
+            move = moves[index]
+            position.make_move(move, ply)
+            if index and null_window:
+                score = -self.negamax(position, depth - 1, ply + 1, -alpha - 1, -alpha, True)
+                if alpha < score < beta:
+                    score = -self.negamax(position, depth - 1, ply + 1, -beta, -alpha, True)
+            else:
+                score = -self.negamax(position, depth - 1, ply + 1, -beta, -alpha, pruning)
+            position.unmake_move(ply)
+            if score > best_value:
+                best_value = score
+                best_move = move
+            elif score == best_value and best_move is not None:
+                best_move = self.break_tie(move, best_move)
+            if pruning:
+                if score > alpha:
+                    alpha = score
                 if beta <= alpha:
                     self.pruned_nodes += 1
+                    self.record_cutoff(max_to_move, from_cell, move, ply, depth, index)
                     break
-            return best_move if depth == self.game.depth else minEval
+
+        if table is not None:
+            if best_value <= alpha_orig:
+                bound = UPPER_BOUND
+            elif best_value >= beta:
+                bound = LOWER_BOUND
+            else:
+                bound = EXACT
+            table.store(key, depth, best_value, bound, best_move)
+        if not ply:
+            self._root_expanded = True
+            self.root_move = best_move
+            self.root_value = best_value if max_to_move else -best_value
+        return best_value
+
+    def aspiration_search(self, state, depth, maximizingPlayer, guess):
+        """searches the root in a narrow window around guess, widening to a full window on failure."""
+        if guess is None or guess in (float('inf'), float('-inf')):
+            return self.alpha_beta_minimax(state, depth, maximizingPlayer)
+        alpha, beta = guess - ASPIRATION_WINDOW, guess + ASPIRATION_WINDOW
+        move = self.alpha_beta_minimax(state, depth, maximizingPlayer, alpha, beta)
+        if alpha < self.root_value < beta:
+            return move
+        return self.alpha_beta_minimax(state, depth, maximizingPlayer)
 
     def print_evaluation_results(self):
-        print(f"total nodes evaluated: {self.node_counter}")
-        print(f"total nodes pruned: {self.pruned_nodes}")
+        if self.last_stats is not None:
+            print(self.last_stats.report())
+
+    def reset_statistics(self):
+        """zeroes the per-search counters that collect_stats reads."""
+        self.node_counter = 0
+        self.pruned_nodes = 0
+        self.evaluations = 0
+        self.terminal_nodes = 0
+        self.iterations = []
+        for counts in (self.ply_nodes, self.cutoffs_per_ply, self.cutoff_indexes):
+            counts[:] = [0] * len(counts)
+
+    def finish_search(self, state, move, source, method, depth, started):
+        """stores last_stats for the move get_best_move settled on and tells the hooks."""
+        self.last_stats = self.collect_stats(source, method, depth, time.perf_counter() - started)
+        if self.hooks is not None:
+            self.hooks.move_chosen(state, move, self.last_stats)
+
+    def collect_stats(self, source, method, depth, seconds):
+        """builds a SearchStats from the counters of the search that just finished."""
+        stats = SearchStats(source, method, depth)
+        stats.seconds = seconds
+        stats.nodes = self.node_counter
+        stats.evaluations = self.evaluations
+        stats.terminal_nodes = self.terminal_nodes
+        stats.leaf_nodes = self.evaluations + self.terminal_nodes
+        stats.pruned_nodes = self.pruned_nodes
+        stats.cutoffs = self.cutoffs
+        stats.first_move_cutoffs = self.first_move_cutoffs
+        stats.nodes_per_ply = trim(self.ply_nodes)
+        stats.cutoffs_per_ply = trim(self.cutoffs_per_ply)
+        stats.cutoff_index_histogram = trim(self.cutoff_indexes)
+        stats.iterations = list(self.iterations)
+        table = self.transposition_table
+        if table is not None:
+            stats.tt_hits, stats.tt_misses, stats.tt_collisions = table.hits, table.misses, table.collisions
+        return stats
+
+    def order_moves(self, state, ply, hash_move=None):
+        """returns the moves of state in search order (see order_moves_into)."""
+        count = self.order_moves_into(state[2], state[0] if state[2] else state[1], ply, hash_move)
+        return self.move_buffers[ply][:count]
+
+    def order_moves_into(self, max_to_move, from_cell, ply, hash_move):
+        """fills move_buffers[ply] with the moves from from_cell and returns how many there are.
+
+        order: hash move, then killer moves, then by history score; ties keep the
+        ascending cell order of the neighbor table.
+        """
+        buffer = self.move_buffers[ply]
+        scores = self.score_buffers[ply]
+        killers = self.killers[ply]
+        history = self.history
+        distances = self.goal_distances()
+        side = 1 if max_to_move else 0
+        base = from_cell * len(distances)
+        count = 0
+        for move in self.game.neighbors[from_cell]:
+            if move == hash_move:
+                score = HASH_MOVE_SCORE
+            elif move == killers[0] or move == killers[1]:
+                score = KILLER_MOVE_SCORE
+            else:
+                score = history.get((base + move) * 2 + side, 0) * DISTANCE_SCALE - distances[move]
+            i = count
+            while i and scores[i - 1] < score:
+                buffer[i] = buffer[i - 1]
+                scores[i] = scores[i - 1]
+                i -= 1
+            buffer[i] = move
+            scores[i] = score
+            count += 1
+        return count
+
+    def goal_distances(self):
+        """distance from every cell to the goal under self.evaluator, rebuilt when the goal moves."""
+        if self._distances_goal != self.game.goal_cell:
+            self._distances = self.evaluator.distance_field(self.game)
+            self._distances_goal = self.game.goal_cell
+        return self._distances
+
+    def set_evaluator(self, evaluator):
+        self.evaluator = evaluator
+        self.invalidate_distances()
 
-    def get_possible_moves_sorted(self, state, player):
-        possible_moves = self.game.get_possible_moves(player)
+    def invalidate_distances(self):
+        """drops the cached distance field, e.g. after the maze walls change.
 
-        return sorted(possible_moves, key=lambda move: self.evaluate_move(state, move, player),
-                      reverse=player == self.game.max)
+        a tablebase solved for the old walls is dropped too.
+        """
+        self._distances_goal = None
+        if self.transposition_table is not None:
+            self.transposition_table.clear()
+        if self.tablebase is not None and self.tablebase.fingerprint != self.maze_fingerprint():
+            self.tablebase = None
 
-    def evaluate_move(self, state, move, player):
-        temp_state = self.game.apply_move(state, move)
+    def maze_fingerprint(self):
+        """maze_fingerprint of the game, recomputed only when its neighbor table is rebuilt."""
+        neighbors, fingerprint = self._fingerprint
+        if neighbors is not self.game.neighbors:
+            fingerprint = maze_fingerprint(self.game)
+            self._fingerprint = (self.game.neighbors, fingerprint)
+        return fingerprint
 
-        return self.evaluate_state(temp_state)
+    def set_tablebase(self, tablebase):
+        """attaches a Tablebase solved for this maze, None detaches it."""
+        if tablebase is not None and tablebase.fingerprint != self.maze_fingerprint():
+            raise ValueError("tablebase was solved for a different maze")
+        self.tablebase = tablebase
+
+    def active_tablebase(self):
+        """the attached tablebase if it covers the current goal, otherwise None."""
+        if self.tablebase is not None and self.tablebase.goal_cell == self.game.goal_cell:
+            return self.tablebase
+        return None
+
+    def tablebase_score(self, value):
+        """search value for the side to move of a won or lost tablebase value, quicker wins score higher."""
+        return TABLEBASE_WIN - value + 1 if value > 0 else -TABLEBASE_WIN - value - 1
+
+    def record_cutoff(self, max_to_move, from_cell, move, ply, depth, index):
+        """updates killers, history and the cutoff counters after move caused a cutoff."""
+        self.cutoffs += 1
+        self.cutoffs_per_ply[ply] += 1
+        self.cutoff_indexes[index] += 1
+        if index == 0:
+            self.first_move_cutoffs += 1
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        key = (from_cell * len(self.game.neighbors) + move) * 2 + (1 if max_to_move else 0)
+        self.history[key] = self.history.get(key, 0) + depth * depth
+
+    def first_move_cutoff_rate(self):
+        """share of cutoffs produced by the first move searched, a measure of ordering quality."""
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
 
     def break_tie(self, move1, move2):
-        # prefer moves that reduce manhattan distance
-        if self.manhattan_distance(move1, self.game.goal) < self.manhattan_distance(move2, self.game.goal):
+        # prefer moves that get closer to the goal under the evaluator's distance
+        distances = self.goal_distances()
+        if distances[move1] < distances[move2]:
             return move1
         else:
             return move2
 
-    def manhattan_distance(self, move, goal):
-        return abs(move[0] - goal[0]) + abs(move[1] - goal[1])
-
     def evaluate_state(self, state):
-        max_pos = state['max_position']
-        min_pos = state['min_position']
-        goal = state['goal']
-        if max_pos == goal:
+        return self.evaluate_cells(state[0], state[1])
+
+    def evaluate_cells(self, max_cell, min_cell):
+        goal_cell = self.game.goal_cell
+        if max_cell == goal_cell:
             return float('inf')  # max wins
-        if min_pos == goal:
+        if min_cell == goal_cell:
             return float('-inf')  # min wins
-        max_distance = abs(max_pos[0] - goal[0]) + abs(max_pos[1] - goal[1])
-        min_distance = abs(min_pos[0] - goal[0]) + abs(min_pos[1] - goal[1])
-        return min_distance - max_distance
+        distances = self.goal_distances()
+        return distances[min_cell] - distances[max_cell]
 
-    def get_best_move(self, alphaBeta=False):
-        self.node_counter = 0
+    def reset_move_ordering(self):
+        """clears killers and ages history scores before a new search."""
+        for killers in self.killers:
+            killers[0] = killers[1] = None
+        self.history = {key: value >> 1 for key, value in self.history.items() if value > 1}
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def get_best_move(self, alphaBeta=False, time_budget_ms=None, max_depth=None, pvs=False, state=None):
+        """returns the best move (x, y) for the player to move, in state if given, else in the game.
+
+        without a budget or max_depth this searches to self.game.depth. otherwise it
+        deepens iteratively from depth 1 up to max_depth and, once time_budget_ms has
+        elapsed, returns the move from the last completed iteration. the transposition
+        table carries best moves from each iteration into the ordering of the next.
+        the counters of the search are left in last_stats (a SearchStats).
+
+        pvs=True runs principal variation search: alpha-beta where every child after the
+        first gets a null window. when deepening iteratively, each iteration after the
+        first searches the root in an aspiration window around the previous score; a
+        fixed-depth search is one full-window pass.
 
-        current_state = self.game.get_current_state()
-        maximizingPlayer = self.game.current_player == self.game.max
+        with a tablebase attached (set_tablebase) a decided position is answered from the
+        table without searching. with a position_cache, fixed-depth searches are looked up
+        there first and their results written back.
+        """
+        started = time.perf_counter()
+        self.cancelled = False
+        self.reset_statistics()
+        if self.transposition_table is not None:
+            self.transposition_table.new_search()
+        self.reset_move_ordering()
+        method = "PVS" if pvs else "AB" if alphaBeta else "MM"
 
-        if alphaBeta:
-            best_move = self.alpha_beta_minimax(current_state, self.game.depth, maximizingPlayer)
+        current_state = self.game.get_current_state() if state is None else state
+
+        # a player already on the goal ends the game, there is no move to make
+        if self.game.goal_cell in (current_state[0], current_state[1]):
+            self.root_value = None
+            self.completed_depth = 0
+            self.finish_search(current_state, None, "search", method, 0, started)
+            return None
+
+        tablebase = self.active_tablebase()
+        if tablebase is not None:
+            move = tablebase.best_move(current_state, self.game.neighbors)
+            if move is not None:
+                value = self.tablebase_score(tablebase.probe(current_state))
+                self.root_value = value if current_state[2] else -value
+                self.finish_search(current_state, move, "tablebase", method, 0, started)
+                return self.game.cell_position(move)
+
+        # only fixed-depth results are repeatable, so only those go through the position cache
+        cache_key = None
+        if self.position_cache is not None and time_budget_ms is None and max_depth is None:
+            cache_key = position_key(self.maze_fingerprint(), self.game.goal_cell, current_state,
+                                     self.game.depth, method, self.evaluator.name,
+                                     "" if self.engine is None else type(self.engine).__name__,
+                                     tablebase is not None)
+            cached = self.position_cache.get(cache_key)
+            if cached is not None:
+                best_move, self.root_value = cached
+                self.finish_search(current_state, best_move, "cache", method, self.game.depth, started)
+                return None if best_move is None else self.game.cell_position(best_move)
+
+        if self.engine is not None and max_depth is None and \
+                (time_budget_ms is None or self.engine.supports_time_budget):
+            self.root_value = None
+            self.completed_depth = self.game.depth
+            best_move = self.engine.search(self, current_state, self.game.depth, alphaBeta or pvs,
+                                             time_budget_ms=time_budget_ms)
+            source = "engine"
         else:
-            best_move = self.minimax(current_state, self.game.depth, maximizingPlayer)
+            if time_budget_ms is None and max_depth is None:
+                depths = [self.game.depth]
+            else:
+                if max_depth is None:
+                    max_depth = self.game.depth if time_budget_ms is None else MAX_SEARCH_DEPTH
+                depths = range(1, max_depth + 1)
+            best_move = self.deepen(current_state, depths, alphaBeta, pvs, time_budget_ms)
+            source = "search"
+        self.finish_search(current_state, best_move, source, method, self.completed_depth, started)
+
+        if cache_key is not None and not self.cancelled:
+            self.position_cache.put(cache_key, best_move, self.root_value)
+        if best_move is None:
+            return None
+        return self.game.cell_position(best_move)
 
+    def deepen(self, state, depths, alphaBeta=False, pvs=False, time_budget_ms=None):
+        """searches state at each of depths in turn and returns the last completed root move (a cell).
+
+        returns None when the root has no move to search (a terminal or walled-in state).
+        once time_budget_ms has elapsed the running iteration is abandoned; the first
+        iteration always completes. sets completed_depth and root_value.
+        """
+        maximizingPlayer = state[2]
+        start = time.perf_counter()
+
+        best_move = None
+        self.completed_depth = 0
+        self.null_window = pvs
+        self.root_value = None
+        completed_value = None
+        try:
+            for depth in depths:
+                # the first iteration always completes so there is a move to return
+                if time_budget_ms is not None and best_move is not None:
+                    self.deadline = start + time_budget_ms / 1000
+                self._root_depth = depth
+                iteration_nodes, iteration_start = self.node_counter, time.perf_counter()
+                if pvs:
+                    move = self.aspiration_search(state, depth, maximizingPlayer, completed_value)
+                elif alphaBeta:
+                    move = self.alpha_beta_minimax(state, depth, maximizingPlayer)
+                else:
+                    move = self.minimax(state, depth, maximizingPlayer)
+                self.iterations.append((depth, self.node_counter - iteration_nodes,
+                                        time.perf_counter() - iteration_start, True))
+                # an unexpanded root hands back its value, not a move
+                if move is None or not self._root_expanded:
+                    break
+                best_move = move
+                completed_value = self.root_value
+                self.completed_depth = depth
+                if self.deadline is not None and time.perf_counter() >= self.deadline:
+                    break
+        except SearchTimeout:
+            self.iterations.append((depth, self.node_counter - iteration_nodes,
+                                    time.perf_counter() - iteration_start, False))
+        finally:
+            self._root_depth = None
+            self.deadline = None
+            self.null_window = False
+        self.root_value = completed_value
         return best_move
@@ -0,0 +1,178 @@
+import argparse, json, mmap, os, random, struct
+from concurrent.futures import ProcessPoolExecutor
+from pyamaze import maze
+
+# shard file: header, then count record offsets, then the binary maze records themselves
+SHARD_HEADER = struct.Struct('<4sII')  # magic, version, record count
+SHARD_MAGIC = b'MZSH'
+SHARD_VERSION = 1
+MANIFEST = "corpus.json"
+
+
+def maze_spec(number, sizes, loop_percents, seed):
+    """(rows, cols, loop_percent, seed) of maze number, cycling through every size for each loop density."""
+    rows, cols = sizes[number % len(sizes)]
+    loop_percent = loop_percents[number // len(sizes) % len(loop_percents)]
+    return rows, cols, loop_percent, f"{seed}:{number}"
+
+
+def generate_maze(rows, cols, loop_percent, seed):
+    """a headless maze drawn only from its own seeded rng, so it does not depend on which worker builds it."""
+    rng = random.Random(seed)
+    goal = rng.randint(1, rows), rng.randint(1, cols)
+    generated = maze(rows, cols, headless=True)
+    generated.CreateMaze(*goal, loopPercent=loop_percent, rng=rng)
+    return generated
+
+
+def write_shard(path, specs):
+    """worker entry point: generates the mazes of specs into one shard file, returns how many."""
+    records = [generate_maze(*spec).toBytes() for spec in specs]
+    offset = SHARD_HEADER.size + 8 * len(records)
+    offsets = []
+    for record in records:
+        offsets.append(offset)
+        offset += len(record)
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as handle:
+        handle.write(SHARD_HEADER.pack(SHARD_MAGIC, SHARD_VERSION, len(records)))
+        handle.write(struct.pack(f'<{len(offsets)}Q', *offsets))
+        for record in records:
+            handle.write(record)
+    os.replace(temporary, path)
+    return len(records)
+
+
+def shard_records(path):
+    """how many mazes the shard file at path holds, None if it is missing or not a shard."""
+    try:
+        with open(path, 'rb') as handle:
+            magic, version, count = SHARD_HEADER.unpack(handle.read(SHARD_HEADER.size))
+    except (OSError, struct.error):
+        return None
+    return count if magic == SHARD_MAGIC and version == SHARD_VERSION else None
+
+
+def build_corpus(directory, count, sizes=((10, 10), (20, 30)), loop_percents=(0, 30, 100), seed=0,
+                 shard_size=1000, workers=None):
+    """generates count mazes into shards of shard_size under directory, one pool task per shard.
+
+    maze number n always comes from the same per-maze seed, so the corpus is identical
+    whatever the number of workers. complete shards already on disk are kept, so an
+    interrupted build picks up where it stopped and count can grow later; any other
+    setting differing from the directory's manifest raises ValueError.
+    """
+    os.makedirs(directory, exist_ok=True)
+    settings = {"version": SHARD_VERSION, "shard_size": shard_size, "seed": seed,
+                "sizes": [list(size) for size in sizes], "loop_percents": list(loop_percents)}
+    manifest_path = os.path.join(directory, MANIFEST)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as handle:
+            previous = json.load(handle)
+        if {name: previous.get(name) for name in settings} != settings:
+            raise ValueError(f"{directory} holds a corpus built with other settings")
+    shards = []
+    tasks = []
+    for first in range(0, count, shard_size):
+        name = f"shard-{first // shard_size:05d}.mzs"
+        shards.append(name)
+        path = os.path.join(directory, name)
+        numbers = range(first, min(first + shard_size, count))
+        if shard_records(path) != len(numbers):
+            tasks.append((path, [maze_spec(number, sizes, loop_percents, seed) for number in numbers]))
+    # the manifest goes first, so even an interrupted build records what its shards hold
+    with open(manifest_path, 'w') as handle:
+        json.dump({**settings, "count": count, "shards": shards}, handle, indent=2)
+    with ProcessPoolExecutor(workers) as pool:
+        for _ in pool.map(write_shard, *zip(*tasks)) if tasks else ():
+            pass
+    return MazeCorpus(directory)
+
+
+class MazeCorpus:
+    """read access to a corpus written by build_corpus.
+
+    shards are memory-mapped on first use and maze #n is found through its shard's
+    offset table, so random access reads one record and iteration streams shard by
+    shard without loading the whole corpus.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST)) as handle:
+            self.manifest = json.load(handle)
+        self.shard_size = self.manifest["shard_size"]
+        self.shards = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for handle, mapped, _ in self.shards.values():
+            mapped.close()
+            handle.close()
+        self.shards = {}
+
+    def __len__(self):
+        return self.manifest["count"]
+
+    def shard(self, index):
+        """(file, mmap, record count) of shard index, mapped on first use."""
+        if index not in self.shards:
+            handle = open(os.path.join(self.directory, self.manifest["shards"][index]), 'rb')
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, records = SHARD_HEADER.unpack_from(mapped)
+            if magic != SHARD_MAGIC or version != SHARD_VERSION:
+                mapped.close()
+                handle.close()
+                raise ValueError(f"{self.manifest['shards'][index]} is not a maze shard")
+            self.shards[index] = (handle, mapped, records)
+        return self.shards[index]
+
+    def spec(self, number):
+        """(rows, cols, loop_percent, seed) maze number was generated from."""
+        return maze_spec(number, self.manifest["sizes"], self.manifest["loop_percents"], self.manifest["seed"])
+
+    def __getitem__(self, number):
+        if number < 0:
+            number += len(self)
+        if not 0 <= number < len(self):
+            raise IndexError(number)
+        _, mapped, records = self.shard(number // self.shard_size)
+        record = number % self.shard_size
+        if record >= records:
+            raise ValueError(f"{self.manifest['shards'][number // self.shard_size]} holds only {records} mazes")
+        offset, = struct.unpack_from('<Q', mapped, SHARD_HEADER.size + 8 * record)
+        return maze.fromBytes(mapped, offset)
+
+    def __iter__(self):
+        for number in range(len(self)):
+            yield self[number]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="build or inspect a sharded corpus of seeded mazes")
+    parser.add_argument("directory")
+    parser.add_argument("--count", type=int, help="build this many mazes, otherwise just summarize")
+    parser.add_argument("--sizes", nargs="+", default=["10x10", "20x30"], help="rowsxcols")
+    parser.add_argument("--loop-percents", type=int, nargs="+", default=[0, 30, 100])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--shard-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.count is not None:
+        sizes = [tuple(int(part) for part in size.split("x")) for size in args.sizes]
+        corpus = build_corpus(args.directory, args.count, sizes, args.loop_percents, args.seed,
+                              args.shard_size, args.workers)
+    else:
+        corpus = MazeCorpus(args.directory)
+    with corpus:
+        print(f"{len(corpus)} mazes in {len(corpus.manifest['shards'])} shards under {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
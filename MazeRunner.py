@@ -1,19 +1,35 @@
-import random, sys
+import queue, random, sys, threading
 from GameSearch import GameSearch
-from pyamaze import maze, agent, textLabel, COLOR
+from SearchStats import GameStats
+from pyamaze import maze, agent, textLabel, COLOR, EAST, WEST, NORTH, SOUTH
+
+AI_POLL_MS = 30  # how often the gui checks on a running ai search
 
 class TurnBasedGame:
-    def __init__(self, size):
-        if size == 10:
+    def __init__(self, size=None, headless=False, loop_percent=100, source_maze=None):
+        # source_maze plays on an existing pyamaze maze (e.g. from a corpus) instead of a new one
+        if source_maze is not None:
+            self.rows = source_maze.rows
+            self.cols = source_maze.cols
+        elif size == 10:
             self.rows = 10
             self.cols = 10
         elif size == 20:
             self.rows = 20
             self.cols = 30
 
-        self.maze = maze(self.rows, self.cols)
-        self.maze.CreateMaze(random.randint(1, self.rows), random.randint(1, self.cols), loopPercent=100,
-                             theme=COLOR.dark)
+        # headless games keep the maze, agents and labels as plain data (no tk window)
+        self.headless = headless
+        self.verbose = not headless
+        self.winner = None
+
+        if source_maze is not None:
+            self.maze = source_maze
+        else:
+            self.maze = maze(self.rows, self.cols, headless=headless)
+            self.maze.CreateMaze(random.randint(1, self.rows), random.randint(1, self.cols),
+                                 loopPercent=loop_percent, theme=COLOR.dark)
+        self.build_neighbor_table()
 
         max_x = random.randint(1, self.rows)
         max_y = random.randint(1, self.cols)
@@ -27,15 +43,24 @@ class TurnBasedGame:
         self.current_player = self.max  # default to max, will be set by MazeRunner
 
         self.depth = 5  # depth for the minimax algorithm
+        self.time_budget_ms = None  # when set, the ai deepens iteratively until this budget runs out
         self.game_search = GameSearch(self)
         self.game_search.search_method = "MM"  # default to minimax
+        self.game_stats = GameStats()  # totals over every ai search of this game
 
         self.human_player = None
+        self.ai_results = None  # queue the gui's running ai search will post to, see start_ai_search
+        self.ai_thread = None
+        self.pondering = False  # search ahead on the human's turn, see start_pondering
+        self.ponder_thread = None
+        self.ponder_stop = None
+        self.ponder_results = {}
         self.turn_label = textLabel(self.maze, "Turn", "Max's Turn")
 
         self.control_instructions = textLabel(self.maze, "Controls", "use wasd or arrow keys to move")
 
-        self.enable_turn_based_control()
+        if not headless:
+            self.enable_turn_based_control()
 
     def set_manual_state(self, max_position, min_position, goal_position):
         """manually set the positions for testing."""
@@ -44,26 +69,71 @@ class TurnBasedGame:
         self.goal = goal_position
         self.current_player = self.min  # you can change this to min if needed
 
+    @property
+    def goal(self):
+        return self._goal
+
+    @goal.setter
+    def goal(self, position):
+        self._goal = position
+        self.goal_cell = self.cell_index(position)
+
+    def build_neighbor_table(self):
+        """precomputes the open neighbors of every cell, indexed by cell number.
+
+        each entry is a tuple of neighbor cells in ascending order, so move lists can be
+        handed out at every ply without touching the maze or allocating. the maze's wall
+        bitmask uses the same cell numbering.
+        """
+        cols = self.cols
+        self.cell_positions = [(x, y) for x in range(1, self.rows + 1) for y in range(1, self.cols + 1)]
+        self.neighbors = []
+        for cell, walls in enumerate(self.maze.walls):
+            cells = []
+            if walls & NORTH:
+                cells.append(cell - cols)
+            if walls & WEST:
+                cells.append(cell - 1)
+            if walls & EAST:
+                cells.append(cell + 1)
+            if walls & SOUTH:
+                cells.append(cell + cols)
+            self.neighbors.append(tuple(cells))
+
+    def add_loops(self, loop_percent):
+        """opens loop_percent% more loops in the current maze, keeping agents and goal.
+
+        the neighbor table is rebuilt and the search's cached distances and
+        transposition table are dropped, since both depend on the walls.
+        """
+        self.maze.addLoops(loop_percent)
+        self.build_neighbor_table()
+        self.game_search.invalidate_distances()
+
+    def cell_index(self, position):
+        return (position[0] - 1) * self.cols + (position[1] - 1)
+
+    def cell_position(self, cell):
+        return self.cell_positions[cell]
+
     def get_current_state(self):
-        return {
-            'max_position': self.max.position,
-            'min_position': self.min.position,
-            'goal': self.goal,
-            'current_player': self.current_player
-        }
+        return self.make_state(self.max.position, self.min.position, self.current_player == self.max)
+
+    def make_state(self, max_position, min_position, max_to_move):
+        """builds a search state.
+
+        states are plain tuples (max_cell, min_cell, max_to_move) of cell indices so they
+        are hashable and cheap to create; the goal is held by the game, not the state.
+        """
+        return (self.cell_index(max_position), self.cell_index(min_position), max_to_move)
 
     def is_terminal(self, state):
-        return state['max_position'] == self.goal or state['min_position'] == self.goal
+        return state[0] == self.goal_cell or state[1] == self.goal_cell
 
     def apply_move(self, state, move):
-        new_state = state.copy()
-        if state['current_player'] == self.max:
-            new_state['max_position'] = move
-            new_state['current_player'] = self.min
-        else:
-            new_state['min_position'] = move
-            new_state['current_player'] = self.max
-        return new_state
+        if state[2]:
+            return (move, state[1], False)
+        return (state[0], move, True)
 
     def set_human_player(self, player):
         """sets which player is controlled by the human."""
@@ -83,10 +153,13 @@ class TurnBasedGame:
             next_player_name = "max"
 
         if self.current_player == self.human_player:
-            print(f"it is {next_player_name}'s turn.")
+            self.log(f"it is {next_player_name}'s turn.")
+            if self.pondering and not self.headless and self.winner is None:
+                self.start_pondering()
         else:
-            print(f"it is {next_player_name}'s turn.")
-            self.ai_move()
+            self.log(f"it is {next_player_name}'s turn.")
+            if not self.headless:
+                self.ai_move()
 
     def move_current_player(self, direction):
         initial_position = self.current_player.position
@@ -102,57 +175,180 @@ class TurnBasedGame:
 
         if self.current_player.position != initial_position:
             current_player_name = "MAX" if self.current_player == self.max else "MIN"
-            print(f"{current_player_name} (human) moved: {self.current_player.position}")
+            self.log(f"{current_player_name} (human) moved: {self.current_player.position}")
 
         if self.current_player.position == self.goal:
-            self.turn_label.value = f"{self.current_player.color.name.capitalize()} Wins!"
-            if self.current_player == self.human_player:
-                print("Human beats AI!")
-            else:
-                print("AI beats Human!")
-            self.maze._win.unbind('<Left>')
-            self.maze._win.unbind('<Right>')
-            self.maze._win.unbind('<Up>')
-            self.maze._win.unbind('<Down>')
+            self.end_game()
             return
 
         self.switch_player()
 
-    def get_possible_moves(self, agent):
-        neighbors = []
-        x, y = agent.position
-        if self.maze.maze_map[(x, y)]['E']:
-            neighbors.append((x, y + 1))
-        if self.maze.maze_map[(x, y)]['W']:
-            neighbors.append((x, y - 1))
-        if self.maze.maze_map[(x, y)]['N']:
-            neighbors.append((x - 1, y))
-        if self.maze.maze_map[(x, y)]['S']:
-            neighbors.append((x + 1, y))
-        return neighbors
+    def get_possible_moves(self, state):
+        """returns the cells the side to move can step to from its cell in state."""
+        if state[2]:
+            return self.neighbors[state[0]]
+        return self.neighbors[state[1]]
+
+    def search_best_move(self, state=None):
+        search_method = self.game_search.search_method
+        return self.game_search.get_best_move(alphaBeta=search_method == "AB",
+                                              time_budget_ms=self.time_budget_ms,
+                                              pvs=search_method == "PVS", state=state)
 
     def ai_move(self):
-        best_move = self.game_search.get_best_move(alphaBeta=self.game_search.search_method == "AB")
+        """plays the ai's move; with a window the search runs on a worker thread instead."""
+        if self.headless:
+            self.play_ai_move(self.search_best_move())
+        else:
+            self.start_ai_search()
+
+    def start_ai_search(self):
+        """searches on a daemon thread so the tk mainloop keeps running.
+
+        the worker only touches the search and posts its move to a queue that
+        poll_ai_search reads from the tk thread via maze._win.after, so every agent and
+        label update still happens on the tk thread.
+        """
+        pondered = self.stop_pondering()
+        if pondered is not None:
+            best_move, self.game_search.last_stats = pondered
+            self.play_ai_move(best_move)
+            return
+        results = queue.Queue(maxsize=1)
+
+        def work():
+            try:
+                results.put((self.search_best_move(), None))
+            except BaseException as error:
+                results.put((None, error))
+
+        self.ai_results = results
+        name = "max" if self.current_player == self.max else "min"
+        self.turn_label.value = f"{name} is thinking..."
+        self.ai_thread = threading.Thread(target=work, name="ai-search", daemon=True)
+        self.ai_thread.start()
+        self.maze._win.after(AI_POLL_MS, self.poll_ai_search, results)
+
+    def poll_ai_search(self, results):
+        if results is not self.ai_results:
+            return  # cancelled
+        try:
+            best_move, error = results.get_nowait()
+        except queue.Empty:
+            self.maze._win.after(AI_POLL_MS, self.poll_ai_search, results)
+            return
+        self.ai_results = None
+        self.ai_thread = None
+        if error is not None:
+            raise error
+        self.play_ai_move(best_move)
+
+    def start_pondering(self):
+        """searches the ai's answer to every human reply on a daemon thread while the human thinks.
+
+        the replies (at most four, one per open neighbour) are searched one after the
+        other, the ones heading towards the goal first, with the game's own search, so
+        even a reply that was not reached in time finds the transposition table warm.
+        finished answers wait in ponder_results for start_ai_search.
+        """
+        state = self.get_current_state()
+        side = 0 if state[2] else 1
+        distances = self.game_search.goal_distances()
+        replies = [self.apply_move(state, move) for move in self.get_possible_moves(state)]
+        replies = sorted((reply for reply in replies if not self.is_terminal(reply)),
+                         key=lambda reply: distances[reply[side]])
+        stop = threading.Event()
+        results = {}
+
+        def work():
+            for reply in replies:
+                best_move = self.search_best_move(reply)
+                if stop.is_set():
+                    return  # the last search may have been cut short
+                self.game_search.last_stats.source = "ponder"
+                results[reply] = (best_move, self.game_search.last_stats)
+
+        self.ponder_stop = stop
+        self.ponder_results = results
+        self.ponder_thread = threading.Thread(target=work, name="ponder", daemon=True)
+        self.ponder_thread.start()
+
+    def stop_pondering(self):
+        """stops the ponder thread and returns its (move, stats) for the current state, or None."""
+        if self.ponder_thread is None:
+            return None
+        self.ponder_stop.set()
+        # a cancel landing just before the next search starts is cleared by it, so repeat until it stops
+        while self.ponder_thread.is_alive():
+            self.game_search.cancel()
+            self.ponder_thread.join(0.01)
+        self.ponder_thread = None
+        return self.ponder_results.pop(self.get_current_state(), None)
+
+    def cancel_ai_search(self):
+        """stops a running gui search and waits for its thread; its move is dropped."""
+        if self.ai_thread is None:
+            return
+        self.ai_results = None
+        # a cancel landing before the worker enters get_best_move is cleared by it, so repeat until it stops
+        while self.ai_thread.is_alive():
+            self.game_search.cancel()
+            self.ai_thread.join(0.01)
+        self.ai_thread = None
+
+    def close(self):
+        self.cancel_ai_search()
+        self.stop_pondering()
+        self.maze._win.destroy()
+
+    def play_ai_move(self, best_move):
+        if self.game_search.last_stats is not None:
+            self.game_stats.add(self.game_search.last_stats)
         if best_move:
             current_player_name = "MAX" if self.current_player == self.max else "MIN"
             self.apply_move_to_agent(self.current_player, best_move)
 
-            print(f"{current_player_name} (AI) moved: {best_move}")
+            self.log(f"{current_player_name} (AI) moved: {best_move}")
 
         if self.current_player.position == self.goal:
-            self.turn_label.value = f"{self.current_player.color.name.capitalize()} Wins!"
-            if self.current_player == self.human_player:
-                print("Human beats AI!")
-            else:
-                print("AI beats Human!")
-            self.maze._win.unbind('<Left>')
-            self.maze._win.unbind('<Right>')
-            self.maze._win.unbind('<Up>')
-            self.maze._win.unbind('<Down>')
+            self.end_game()
             return
 
         self.switch_player()
 
+    def end_game(self):
+        """records the current player as the winner and stops accepting moves."""
+        self.winner = self.current_player
+        self.turn_label.value = f"{self.current_player.color.name.capitalize()} Wins!"
+        if self.current_player == self.human_player:
+            self.log("Human beats AI!")
+        else:
+            self.log("AI beats Human!")
+        if self.game_stats.searches:
+            self.log(self.game_stats.report())
+        self.stop_pondering()
+        if self.headless:
+            return
+        self.maze._win.unbind('<Left>')
+        self.maze._win.unbind('<Right>')
+        self.maze._win.unbind('<Up>')
+        self.maze._win.unbind('<Down>')
+
+    def play(self, max_turns=500):
+        """plays ai against ai until a player reaches the goal or max_turns is hit.
+
+        returns the winning agent, or None if the game was cut off.
+        """
+        turns = 0
+        while self.winner is None and turns < max_turns:
+            self.ai_move()
+            turns += 1
+        return self.winner
+
+    def log(self, message):
+        if self.verbose:
+            print(message)
+
     def apply_move_to_agent(self, agent, move):
         if move[0] > agent.x:
             agent.moveDown(None)
@@ -166,19 +362,19 @@ class TurnBasedGame:
     def enable_turn_based_control(self):
         def move_left(event):
             if self.current_player == self.human_player:
-                self.move_current_player('Left')
+                self.move_current_player('left')
 
         def move_right(event):
             if self.current_player == self.human_player:
-                self.move_current_player('Right')
+                self.move_current_player('right')
 
         def move_up(event):
             if self.current_player == self.human_player:
-                self.move_current_player('Up')
+                self.move_current_player('up')
 
         def move_down(event):
             if self.current_player == self.human_player:
-                self.move_current_player('Down')
+                self.move_current_player('down')
 
         self.maze._win.bind('<Left>', move_left)
         self.maze._win.bind('<Right>', move_right)
@@ -189,13 +385,16 @@ class TurnBasedGame:
         self.maze._win.bind('d', move_right)
         self.maze._win.bind('w', move_up)
         self.maze._win.bind('s', move_down)
+        self.maze._win.protocol('WM_DELETE_WINDOW', self.close)
 
     def run(self):
         self.maze.run()
 
+USAGE = "MazeRunner.py [player] [searchmethod] [size] [ponder]"
+
 def main():
-    if len(sys.argv) != 4:
-        print("Usage: MazeRunner.py [player] [searchmethod] [size]")
+    if len(sys.argv) not in (4, 5) or len(sys.argv) == 5 and sys.argv[4] != "ponder":
+        print("Usage: " + USAGE)
         print("Example: MazeRunner.py 1 MM 10")
 
         sys.exit(1)
@@ -204,9 +403,9 @@ def main():
     searchmethod = sys.argv[2]
     size = int(sys.argv[3])
 
-    if player not in [1, 2] or searchmethod not in ['MM', 'AB'] or size not in [10, 20]:
+    if player not in [1, 2] or searchmethod not in ['MM', 'AB', 'PVS'] or size not in [10, 20]:
         print("Invalid input arguments.")
-        print("MazeRunner.py [player] [searchmethod] [size]")
+        print(USAGE)
         sys.exit(1)
 
     game = TurnBasedGame(size)
@@ -219,7 +418,7 @@ def main():
         game.current_player = game.min
 
     game.game_search.search_method = searchmethod
-
+    game.pondering = len(sys.argv) == 5
 
     print("WASD or arrow keys to move!")
     game.run()
@@ -0,0 +1,194 @@
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from Evaluators import EVALUATORS
+from GameSearch import GameSearch, MAX_SEARCH_DEPTH
+from TranspositionTable import SharedTranspositionTable
+
+
+class GameSnapshot:
+    """the parts of a TurnBasedGame the search needs, as plain picklable data.
+
+    workers rebuild a GameSearch on top of a snapshot instead of a real game, so no
+    maze, agents or tk objects ever cross the process boundary.
+    """
+
+    def __init__(self, rows, cols, neighbors, goal, depth):
+        self.rows = rows
+        self.cols = cols
+        self.neighbors = neighbors
+        self.cell_positions = [(x, y) for x in range(1, rows + 1) for y in range(1, cols + 1)]
+        self.goal = goal
+        self.goal_cell = (goal[0] - 1) * cols + (goal[1] - 1)
+        self.depth = depth
+
+    @classmethod
+    def from_game(cls, game):
+        return cls(game.rows, game.cols, tuple(game.neighbors), game.goal, game.depth)
+
+    def __getstate__(self):
+        return (self.rows, self.cols, self.neighbors, self.goal, self.depth)
+
+    def rotated(self, shift):
+        """returns a copy whose neighbor lists start shift entries later, for a different move order."""
+        neighbors = tuple(cells[shift % len(cells):] + cells[:shift % len(cells)] if cells else cells
+                          for cells in self.neighbors)
+        return GameSnapshot(self.rows, self.cols, neighbors, self.goal, self.depth)
+
+    def __setstate__(self, data):
+        self.__init__(*data)
+
+
+def search_subtree(snapshot, state, depth, pruning, evaluator_name):
+    """worker entry point: returns (value for max, nodes searched) of state."""
+    search = GameSearch(snapshot, tt_size=(1 << 16) if pruning else 0, evaluator=EVALUATORS[evaluator_name]())
+    value = search.search_value(state, depth, pruning)
+    return value, search.node_counter
+
+
+def lazy_smp_worker(snapshot, state, max_depth, pruning, evaluator_name, table_name, table_size, generation,
+                    worker_index, time_budget_ms):
+    """worker entry point: deepens on state against the shared table, returns (depth, move, nodes)."""
+    if worker_index:
+        snapshot = snapshot.rotated(worker_index)
+    search = GameSearch(snapshot, tt_size=0, evaluator=EVALUATORS[evaluator_name]())
+    table = SharedTranspositionTable(table_size, name=table_name)
+    table.generation = generation
+    search.transposition_table = table
+    # odd helpers start one ply deeper so the processes spread over neighbouring depths
+    first_depth = min(1 + worker_index % 2, max_depth)
+    try:
+        move = search.deepen(state, range(first_depth, max_depth + 1), alphaBeta=pruning,
+                             time_budget_ms=time_budget_ms)
+        return search.completed_depth, move, search.node_counter
+    finally:
+        search.transposition_table = None
+        table.close()
+
+
+class RootSplitSearch:
+    """splits the first split_plies plies of the tree across a process pool.
+
+    every subtree below the split is searched with a full window by a worker, so the
+    backed-up values are exact and the root move is picked with the same ascending
+    order and break_tie rule as sequential minimax, whatever order workers finish in.
+    """
+
+    supports_time_budget = False
+
+    def __init__(self, workers=None, split_plies=2):
+        self.workers = workers or os.cpu_count()
+        self.split_plies = split_plies
+        self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def search(self, game_search, state, depth, pruning, time_budget_ms=None):
+        """returns the best root move (a cell) for state and sets game_search.node_counter."""
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(self.workers)
+        snapshot = GameSnapshot.from_game(game_search.game)
+        self.nodes = 0
+        tree = self.split(game_search, snapshot, state, depth, self.split_plies, pruning)
+        if not isinstance(tree, list):
+            return None
+        best_move = self.backup(game_search, state, tree, root=True)
+        game_search.node_counter = self.nodes
+        return best_move
+
+    def split(self, game_search, snapshot, state, depth, plies, pruning):
+        """expands the top plies locally; returns a value, a worker future or a list of (move, subtree)."""
+        game = game_search.game
+        if depth == 0 or game.is_terminal(state):
+            self.nodes += 1
+            return game_search.evaluate_state(state)
+        if plies == 0:
+            return self.pool.submit(search_subtree, snapshot, state, depth, pruning, game_search.evaluator.name)
+        self.nodes += 1
+        return [(move, self.split(game_search, snapshot, game.apply_move(state, move), depth - 1, plies - 1, pruning))
+                for move in game.get_possible_moves(state)]
+
+    def backup(self, game_search, state, tree, root=False):
+        """minimax over the split tree in move order, using break_tie on equal values."""
+        maximizing = state[2]
+        best_value = float('-inf') if maximizing else float('inf')
+        best_move = None
+        for move, subtree in tree:
+            if isinstance(subtree, Future):
+                value, nodes = subtree.result()
+                self.nodes += nodes
+            elif isinstance(subtree, list):
+                value = self.backup(game_search, game_search.game.apply_move(state, move), subtree)
+            else:
+                value = subtree
+            if (value > best_value) if maximizing else (value < best_value):
+                best_value = value
+                best_move = move
+            elif value == best_value and best_move is not None:
+                best_move = game_search.break_tie(move, best_move)
+        return best_move if root else best_value
+
+
+class LazySMPSearch:
+    """lazy smp: every worker searches the whole root and they share one transposition table.
+
+    workers differ only in their move order and starting depth; the table lets each
+    reuse what the others found. the deepest completed result wins, ties going to the
+    lowest worker index. unlike RootSplitSearch this also works under a time budget and
+    keeps every core busy when the root has only two or three moves.
+
+    plain minimax (pruning=False) never touches the table, so its workers would all
+    search the same tree; it is run as one ordinary search in this process instead.
+    """
+
+    supports_time_budget = True
+
+    def __init__(self, workers=None, table_size=1 << 20):
+        self.workers = workers or os.cpu_count()
+        self.table_size = table_size
+        self.pool = None
+        self.table = None
+        self.generation = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        if self.table is not None:
+            self.table.unlink()
+            self.table = None
+
+    def search(self, game_search, state, depth, pruning, time_budget_ms=None):
+        """returns the deepest completed root move (a cell) and sets game_search's counters."""
+        if not pruning:
+            depths = [depth] if time_budget_ms is None else range(1, MAX_SEARCH_DEPTH + 1)
+            return game_search.deepen(state, depths, time_budget_ms=time_budget_ms)
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(self.workers)
+            self.table = SharedTranspositionTable(self.table_size, create=True)
+        self.generation += 1
+        snapshot = GameSnapshot.from_game(game_search.game)
+        max_depth = depth if time_budget_ms is None else MAX_SEARCH_DEPTH
+        futures = [self.pool.submit(lazy_smp_worker, snapshot, state, max_depth, pruning,
+                                    game_search.evaluator.name, self.table.name, self.table_size,
+                                    self.generation, index, time_budget_ms)
+                   for index in range(self.workers)]
+        results = [future.result() for future in futures]
+        completed_depth, best_move, _ = max(results, key=lambda result: result[0])
+        game_search.node_counter = sum(result[2] for result in results)
+        game_search.completed_depth = completed_depth
+        return best_move
@@ -0,0 +1,238 @@
+import hashlib, math, mmap, os, struct
+
+HEADER = b'MZPC0001'
+RECORD = struct.Struct('<20sid')  # key digest, best move (-1 for none), root value (nan for none)
+
+# the index file beside the records is a header and then an open-addressing hash table
+# of (key prefix, record offset) slots; offset 0 marks an empty slot
+INDEX_MAGIC = b'MZPI0001'
+INDEX_HEADER = struct.Struct('<8sQQQQ')  # magic, records file inode, end of indexed records, slots, keys
+SLOT = struct.Struct('<QQ')
+
+
+def position_key(fingerprint, goal_cell, state, depth, method, evaluator_name, engine_name="",
+                 tablebase=False):
+    """20-byte cache key of a fixed-depth search of state in one maze, goal and search setup.
+
+    the setup is the method, the evaluator, the engine that answered (its class name, ""
+    for the built-in search) and whether a tablebase scored the leaves, since each of
+    them can change the move or the value.
+    """
+    digest = hashlib.sha1(fingerprint)
+    digest.update(struct.pack('<IIIBI', goal_cell, state[0], state[1], state[2], depth))
+    digest.update(f"{method}/{evaluator_name}/{engine_name}/{'tablebase' if tablebase else ''}".encode())
+    return digest.digest()
+
+
+def key_prefix(key):
+    return int.from_bytes(key[:8], 'little')
+
+
+def find_slot(table, slots, key):
+    """(slot, record offset) of key in an index table; offset 0 means absent, the slot is then free."""
+    prefix = key_prefix(key)
+    mask = slots - 1
+    slot = prefix & mask
+    while True:
+        stored, offset = SLOT.unpack_from(table, INDEX_HEADER.size + slot * SLOT.size)
+        if not offset or stored == prefix:
+            return slot, offset
+        slot = (slot + 1) & mask
+
+
+def index_slots(entries):
+    """table size for up to entries keys, a power of two keeping the table at most half full."""
+    return 1 << (2 * max(entries, 1) - 1).bit_length()
+
+
+def write_index(path, slots):
+    """builds the index file of the records file at path from scratch, replacing it atomically."""
+    with open(path, 'rb') as handle:
+        inode = os.fstat(handle.fileno()).st_ino
+        data = handle.read()
+    end = len(data) - (len(data) - len(HEADER)) % RECORD.size
+    table = bytearray(INDEX_HEADER.size + slots * SLOT.size)
+    keys = 0
+    for offset in range(len(HEADER), end, RECORD.size):
+        key = data[offset:offset + 20]
+        slot, previous = find_slot(table, slots, key)
+        keys += not previous
+        SLOT.pack_into(table, INDEX_HEADER.size + slot * SLOT.size, key_prefix(key), offset)
+    INDEX_HEADER.pack_into(table, 0, INDEX_MAGIC, inode, end, slots, keys)
+    temporary = path + '.idx.tmp'
+    with open(temporary, 'wb') as handle:
+        handle.write(table)
+    os.replace(temporary, path + '.idx')
+
+
+class PositionCache:
+    """on-disk cache of root search results shared across games and processes.
+
+    path holds a short header followed by fixed-size records appended in write order.
+    path + '.idx' is a hash table from key to the newest record's offset, which the
+    writer updates in place after each append and everyone memory-maps, so opening
+    the cache does not read the records. the index names the inode of the records
+    file and how far into it it reaches: an index for another file is rebuilt by the
+    writer (readers fall back to scanning the records), and records past its end are
+    indexed by the writer or kept in a small dict by readers.
+
+    each record goes out in a single append before it is indexed, so any number of
+    read-only processes can use the cache next to one writer. a reader only returns
+    records that were in the file when it opened or last called refresh(). a torn
+    record at the end of the file is ignored.
+
+    once the file holds max_entries records the writer compacts it, keeping the newest
+    half of the distinct keys, into new files that replace the old ones atomically.
+    readers notice the new file on their next refresh() and reopen.
+    """
+
+    def __init__(self, path, max_entries=1 << 20, readonly=False):
+        self.path = path
+        self.max_entries = max_entries
+        self.readonly = readonly
+        self.hits = 0
+        self.misses = 0
+        if not readonly and not os.path.exists(path):
+            with open(path, 'wb') as handle:
+                handle.write(HEADER)
+        self.open()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def open(self):
+        self.handle = open(self.path, 'rb' if self.readonly else 'a+b')
+        self.handle.seek(0)
+        if self.handle.read(len(HEADER)) != HEADER:
+            self.handle.close()
+            raise ValueError(f"{self.path} is not a position cache file")
+        self.index = None
+        self.index_handle = None
+        self.unindexed = {}
+        self.loaded = self.scanned = len(HEADER)
+        if not self.readonly:
+            size = os.fstat(self.handle.fileno()).st_size
+            slots = index_slots(max(self.max_entries, (size - len(HEADER)) // RECORD.size))
+            if not self.map_index() or self.slots < slots:
+                self.close_index()
+                write_index(self.path, slots)
+                self.map_index()
+        else:
+            self.map_index()
+        self.refresh()
+
+    def map_index(self):
+        """maps the index file if it belongs to the open records file, returns whether it did."""
+        try:
+            self.index_handle = open(self.path + '.idx', 'rb' if self.readonly else 'r+b')
+            self.index = mmap.mmap(self.index_handle.fileno(), 0,
+                                   access=mmap.ACCESS_READ if self.readonly else mmap.ACCESS_WRITE)
+            magic, inode, end, self.slots, _ = INDEX_HEADER.unpack_from(self.index)
+        except (OSError, ValueError, struct.error):
+            self.close_index()
+            return False
+        if magic != INDEX_MAGIC or inode != os.fstat(self.handle.fileno()).st_ino or \
+                end > os.fstat(self.handle.fileno()).st_size:
+            self.close_index()
+            return False
+        self.scanned = end
+        return True
+
+    def close_index(self):
+        if self.index is not None:
+            self.index.close()
+        if self.index_handle is not None:
+            self.index_handle.close()
+        self.index = None
+        self.index_handle = None
+
+    def close(self):
+        self.close_index()
+        self.handle.close()
+
+    def __len__(self):
+        """distinct keys, counted twice for readers when a key is both indexed and in their tail."""
+        keys = INDEX_HEADER.unpack_from(self.index)[4] if self.index is not None else 0
+        return keys + len(self.unindexed)
+
+    def refresh(self):
+        """makes the whole records appended since the file was last read visible.
+
+        a records file replaced by the writer's compact() is reopened.
+        """
+        try:
+            replaced = os.stat(self.path).st_ino != os.fstat(self.handle.fileno()).st_ino
+        except FileNotFoundError:
+            replaced = False
+        if replaced:
+            self.close()
+            self.open()
+            return
+        size = os.fstat(self.handle.fileno()).st_size
+        end = size - (size - len(HEADER)) % RECORD.size
+        if self.index is not None:
+            self.scanned = max(self.scanned, INDEX_HEADER.unpack_from(self.index)[2])
+        if end > self.scanned:
+            self.handle.seek(self.scanned)
+            data = self.handle.read(end - self.scanned)
+            for start in range(0, len(data), RECORD.size):
+                if self.readonly:
+                    self.unindexed[data[start:start + 20]] = self.scanned + start
+                else:
+                    self.insert(data[start:start + 20], self.scanned + start)
+            self.scanned = end
+        self.loaded = end
+        self.records = (end - len(HEADER)) // RECORD.size
+
+    def insert(self, key, offset):
+        """points the writer's index at the record at offset, which must already be on disk."""
+        slot, previous = find_slot(self.index, self.slots, key)
+        SLOT.pack_into(self.index, INDEX_HEADER.size + slot * SLOT.size, key_prefix(key), offset)
+        magic, inode, _, slots, keys = INDEX_HEADER.unpack_from(self.index)
+        INDEX_HEADER.pack_into(self.index, 0, magic, inode, offset + RECORD.size, slots, keys + (not previous))
+
+    def get(self, key):
+        """returns (move, value) stored for key, move and value being None when there was no move."""
+        offset = self.unindexed.get(key, 0)
+        if self.index is not None:
+            offset = max(offset, find_slot(self.index, self.slots, key)[1])
+        if offset and offset < self.loaded:
+            self.handle.seek(offset)
+            stored, move, value = RECORD.unpack(self.handle.read(RECORD.size))
+            # a slot shared by another key with the same prefix, or one being rewritten, is a miss
+            if stored == key:
+                self.hits += 1
+                return (None if move < 0 else move), (None if math.isnan(value) else value)
+        self.misses += 1
+        return None
+
+    def put(self, key, move, value):
+        if self.readonly:
+            return
+        if self.records >= self.max_entries:
+            self.compact(self.max_entries // 2)
+        record = RECORD.pack(key, -1 if move is None else move, math.nan if value is None else value)
+        self.handle.seek(0, os.SEEK_END)
+        offset = self.handle.tell()
+        self.handle.write(record)
+        self.handle.flush()
+        self.insert(key, offset)
+        self.records += 1
+        self.loaded = self.scanned = offset + RECORD.size
+
+    def compact(self, keep):
+        """rewrites the file with only the newest record of the keep most recently written keys."""
+        offsets = sorted(offset for _, offset in SLOT.iter_unpack(self.index[INDEX_HEADER.size:]) if offset)
+        temporary = self.path + '.tmp'
+        with open(temporary, 'wb') as handle:
+            handle.write(HEADER)
+            for offset in offsets[-keep:] if keep else ():
+                self.handle.seek(offset)
+                handle.write(self.handle.read(RECORD.size))
+        self.close()
+        os.replace(temporary, self.path)
+        write_index(self.path, self.slots)
+        self.open()
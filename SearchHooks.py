@@ -0,0 +1,74 @@
+import json, random
+
+
+class SearchHooks:
+    """no-op base for tracers attached with GameSearch.hooked() or GameSearch(hooks=...).
+
+    states are (max_cell, min_cell, max_to_move) tuples and values are from the side to
+    move's point of view, as inside the negamax kernel. node_exit is skipped for nodes
+    abandoned by a time budget. searches handed to an external engine fire only
+    move_chosen.
+    """
+
+    def node_enter(self, state, depth, ply, alpha, beta):
+        pass
+
+    def node_exit(self, state, depth, ply, value, nodes):
+        """nodes is the size of the subtree below and including this node."""
+
+    def leaf(self, state, value):
+        """a depth-0 node scored by the evaluator (or the tablebase)."""
+
+    def cutoff(self, max_to_move, from_cell, move, ply, depth, index):
+        """move, the index-th one searched, failed high at ply."""
+
+    def move_chosen(self, state, move, stats):
+        """get_best_move picked move (a cell, or None) from state; stats is its SearchStats."""
+
+
+class TreeTracer(SearchHooks):
+    """writes the top of every search tree to a json lines file.
+
+    one line per node of ply <= max_ply, written when the node is left:
+    {"ply", "depth", "max", "min", "max_to_move", "alpha", "beta", "value", "nodes"}, plus
+    one {"move", "state", "nodes"} line per get_best_move. with sample_rate below 1 each
+    node is kept with that probability (seeded, so reruns pick the same nodes).
+    """
+
+    def __init__(self, path, max_ply=3, sample_rate=1.0, seed=0):
+        self.handle = open(path, 'w')
+        self.max_ply = max_ply
+        self.sample_rate = sample_rate
+        self.random = random.Random(seed)
+        self.windows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.handle.close()
+
+    def node_enter(self, state, depth, ply, alpha, beta):
+        if ply <= self.max_ply:
+            del self.windows[ply:]
+            self.windows.append((alpha, beta))
+
+    def node_exit(self, state, depth, ply, value, nodes):
+        if ply > self.max_ply or (self.sample_rate < 1 and self.random.random() >= self.sample_rate):
+            return
+        alpha, beta = self.windows[ply]
+        self.write({"ply": ply, "depth": depth, "max": state[0], "min": state[1], "max_to_move": state[2],
+                    "alpha": alpha, "beta": beta, "value": value, "nodes": nodes})
+
+    def move_chosen(self, state, move, stats):
+        self.write({"move": move, "state": list(state), "nodes": stats.nodes})
+
+    def write(self, record):
+        # json has no infinities, wins and losses are written as strings
+        for name in ("alpha", "beta", "value"):
+            if record.get(name) in (float('inf'), float('-inf')):
+                record[name] = str(record[name])
+        self.handle.write(json.dumps(record, separators=(',', ':')) + '\n')
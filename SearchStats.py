@@ -0,0 +1,135 @@
+def trim(counts):
+    """drops trailing zero entries from a per-ply list."""
+    end = len(counts)
+    while end and not counts[end - 1]:
+        end -= 1
+    return list(counts[:end])
+
+
+class SearchStats:
+    """what one get_best_move did, built by GameSearch.collect_stats and kept as last_stats.
+
+    source says where the move came from: "search" for the built-in kernel, "engine"
+    for an external engine (which only reports its node total), "tablebase" or "cache"
+    when no search ran, and "ponder" for a search run ahead of time on the opponent's
+    turn (see TurnBasedGame.start_pondering). iterations holds one (depth, nodes, seconds, completed) tuple
+    per iterative deepening step.
+    """
+
+    COUNTERS = ("nodes", "leaf_nodes", "evaluations", "terminal_nodes", "pruned_nodes", "cutoffs",
+                "first_move_cutoffs", "tt_hits", "tt_misses", "tt_collisions", "seconds")
+
+    def __init__(self, source, method, depth):
+        self.source = source
+        self.method = method
+        self.depth = depth
+        self.seconds = 0.0
+        self.nodes = 0
+        self.leaf_nodes = 0
+        self.evaluations = 0
+        self.terminal_nodes = 0
+        self.pruned_nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.tt_hits = 0
+        self.tt_misses = 0
+        self.tt_collisions = 0
+        self.nodes_per_ply = []
+        self.cutoffs_per_ply = []
+        self.cutoff_index_histogram = []
+        self.iterations = []
+
+    @property
+    def interior_nodes(self):
+        return self.nodes - self.leaf_nodes
+
+    @property
+    def effective_branching_factor(self):
+        """b such that b ** depth is the node count of the deepest completed iteration."""
+        completed = [iteration for iteration in self.iterations if iteration[3]]
+        if completed:
+            depth, nodes = completed[-1][0], completed[-1][1]
+        else:
+            depth, nodes = self.depth, self.nodes
+        return nodes ** (1 / depth) if depth and nodes else 0.0
+
+    @property
+    def first_move_cutoff_rate(self):
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    @property
+    def tt_hit_rate(self):
+        probes = self.tt_hits + self.tt_misses + self.tt_collisions
+        return self.tt_hits / probes if probes else 0.0
+
+    def as_dict(self):
+        data = {name: getattr(self, name) for name in self.COUNTERS}
+        data.update(source=self.source, method=self.method, depth=self.depth,
+                    interior_nodes=self.interior_nodes,
+                    effective_branching_factor=self.effective_branching_factor,
+                    nodes_per_ply=self.nodes_per_ply, cutoffs_per_ply=self.cutoffs_per_ply,
+                    cutoff_index_histogram=self.cutoff_index_histogram,
+                    iterations=[list(iteration) for iteration in self.iterations])
+        return data
+
+    def report(self):
+        lines = [
+            f"{self.method} depth {self.depth} ({self.source}): {self.nodes} nodes in {self.seconds:.3f}s",
+            f"  leaves: {self.leaf_nodes} ({self.evaluations} evaluated, {self.terminal_nodes} terminal), "
+            f"interior: {self.interior_nodes}, effective branching factor: {self.effective_branching_factor:.2f}",
+            f"  nodes per ply: {self.nodes_per_ply}",
+            f"  cutoffs: {self.cutoffs} ({self.pruned_nodes} pruned), per ply: {self.cutoffs_per_ply}, "
+            f"by move index: {self.cutoff_index_histogram}, first move: {self.first_move_cutoff_rate:.1%}",
+            f"  transposition table hits: {self.tt_hits}, misses: {self.tt_misses}, "
+            f"collisions: {self.tt_collisions}",
+        ]
+        for depth, nodes, seconds, completed in self.iterations:
+            lines.append(f"  iteration {depth}: {nodes} nodes in {seconds:.3f}s"
+                         f"{'' if completed else ' (abandoned)'}")
+        return "\n".join(lines)
+
+
+class GameStats:
+    """running totals over every search of a game (or of many), fed with add()."""
+
+    def __init__(self):
+        self.searches = 0
+        self.sources = {}
+        self.totals = dict.fromkeys(SearchStats.COUNTERS, 0)
+        self.nodes_per_ply = []
+        self.cutoffs_per_ply = []
+        self.cutoff_index_histogram = []
+        self.deepest = 0
+
+    def add(self, stats):
+        self.searches += 1
+        self.sources[stats.source] = self.sources.get(stats.source, 0) + 1
+        for name in SearchStats.COUNTERS:
+            self.totals[name] += getattr(stats, name)
+        for total, counts in ((self.nodes_per_ply, stats.nodes_per_ply),
+                              (self.cutoffs_per_ply, stats.cutoffs_per_ply),
+                              (self.cutoff_index_histogram, stats.cutoff_index_histogram)):
+            total.extend([0] * (len(counts) - len(total)))
+            for index, count in enumerate(counts):
+                total[index] += count
+        self.deepest = max(self.deepest, stats.depth or 0)
+
+    @property
+    def mean_nodes(self):
+        return self.totals["nodes"] / self.searches if self.searches else 0.0
+
+    def as_dict(self):
+        return {"searches": self.searches, "sources": dict(self.sources), "deepest": self.deepest,
+                "mean_nodes": self.mean_nodes, "nodes_per_ply": self.nodes_per_ply,
+                "cutoffs_per_ply": self.cutoffs_per_ply, "cutoff_index_histogram": self.cutoff_index_histogram,
+                **self.totals}
+
+    def report(self):
+        totals = self.totals
+        return "\n".join([
+            f"{self.searches} searches {self.sources}: {totals['nodes']} nodes in {totals['seconds']:.3f}s, "
+            f"{self.mean_nodes:.0f} per search, deepest {self.deepest}",
+            f"  cutoffs: {totals['cutoffs']}, by move index: {self.cutoff_index_histogram}",
+            f"  transposition table hits: {totals['tt_hits']}, misses: {totals['tt_misses']}, "
+            f"collisions: {totals['tt_collisions']}",
+        ])
@@ -0,0 +1,144 @@
+import struct
+import numpy as np
+from GameSearch import maze_fingerprint
+
+# file layout: header, then one signed value per position in index order
+HEADER = struct.Struct('<4sHHI20sB3x')  # magic, rows, cols, goal_cell, maze fingerprint, value width
+MAGIC = b'MZTB'
+
+# values are from the side to move's point of view: w + 1 for a win in w plies,
+# -(l + 1) for a loss in l plies and 0 for a draw (neither side can force the goal)
+DRAW = 0
+
+
+class Tablebase:
+    """exact win/loss/distance for every position of one maze and goal.
+
+    a position (max_cell, min_cell, max_to_move) lives at index
+    (side * cells + max_cell) * cells + min_cell with side 0 when max is to move.
+    solve() fills the table by retrograde analysis, working back from the positions
+    where someone stands on the goal one ply at a time, each ply as a handful of numpy
+    operations over the whole frontier. a 20x30 maze (720k positions) takes seconds;
+    save() writes it out and load() maps it back read-only.
+    """
+
+    def __init__(self, rows, cols, goal_cell, fingerprint, values):
+        self.rows = rows
+        self.cols = cols
+        self.cells = rows * cols
+        self.goal_cell = goal_cell
+        self.fingerprint = fingerprint
+        self.values = values
+
+    @classmethod
+    def solve(cls, game):
+        cells = game.rows * game.cols
+        goal_cell = game.goal_cell
+        neighbors = np.full((cells, 4), -1, dtype=np.int64)
+        for cell, moves in enumerate(game.neighbors):
+            neighbors[cell, :len(moves)] = moves
+        degree = (neighbors >= 0).sum(axis=1)
+
+        index = np.arange(2 * cells * cells)
+        side = index // (cells * cells)
+        max_cells = index // cells % cells
+        min_cells = index % cells
+        max_won = max_cells == goal_cell
+        min_won = (min_cells == goal_cell) & ~max_won
+        terminal = max_won | min_won
+
+        values = np.zeros(len(index), dtype=np.int32)
+        mover_won = np.where(side == 0, max_won, min_won)
+        values[terminal & mover_won] = 1
+        values[terminal & ~mover_won] = -1
+        # children of each position still not known to be wins for the opponent
+        unresolved = degree[np.where(side == 0, max_cells, min_cells)]
+
+        def predecessors(positions):
+            # the side not to move made the last move, from any neighbour of its cell
+            previous = []
+            for to_move, moved, stay in ((0, min_cells, max_cells), (1, max_cells, min_cells)):
+                group = positions[side[positions] == to_move]
+                origins = neighbors[moved[group]]
+                valid = origins >= 0
+                origins = origins[valid]
+                stayed = np.repeat(stay[group], valid.sum(axis=1))
+                if to_move == 0:
+                    previous.append((cells + stayed) * cells + origins)
+                else:
+                    previous.append(origins * cells + stayed)
+            previous = np.concatenate(previous)
+            return previous[~terminal[previous]]
+
+        losses = np.nonzero(values == -1)[0]
+        wins = np.nonzero(values == 1)[0]
+        plies = 1
+        while len(losses) or len(wins):
+            # a move into a lost position wins, and the first time that is found is the fastest
+            won = np.unique(predecessors(losses))
+            won = won[values[won] == 0]
+            values[won] = plies + 1
+            # a position loses once every move leads to a position the opponent wins
+            previous = predecessors(wins)
+            previous = previous[values[previous] == 0]
+            unresolved -= np.bincount(previous, minlength=len(unresolved)).astype(unresolved.dtype)
+            lost = np.unique(previous[unresolved[previous] == 0])
+            values[lost] = -(plies + 1)
+            losses, wins = lost, won
+            plies += 1
+        if plies < np.iinfo(np.int16).max:
+            values = values.astype(np.int16)
+        return cls(game.rows, game.cols, goal_cell, maze_fingerprint(game), values)
+
+    def save(self, path):
+        with open(path, 'wb') as handle:
+            handle.write(HEADER.pack(MAGIC, self.rows, self.cols, self.goal_cell, self.fingerprint,
+                                     self.values.dtype.itemsize))
+            handle.write(np.ascontiguousarray(self.values).tobytes())
+
+    @classmethod
+    def load(cls, path):
+        """maps a saved table read-only; pages are only read in as positions are probed."""
+        with open(path, 'rb') as handle:
+            magic, rows, cols, goal_cell, fingerprint, width = HEADER.unpack(handle.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a tablebase file")
+        cells = rows * cols
+        values = np.memmap(path, dtype=np.dtype(f'<i{width}'), mode='r', offset=HEADER.size,
+                           shape=(2 * cells * cells,))
+        return cls(rows, cols, goal_cell, fingerprint, values)
+
+    def matches(self, game):
+        """true when this table was solved for game's maze and current goal."""
+        return self.goal_cell == game.goal_cell and self.rows == game.rows and self.cols == game.cols \
+            and self.fingerprint == maze_fingerprint(game)
+
+    def index(self, state):
+        return ((0 if state[2] else 1) * self.cells + state[0]) * self.cells + state[1]
+
+    def probe(self, state):
+        """raw value of state for the side to move, see DRAW."""
+        return int(self.values[self.index(state)])
+
+    def best_move(self, state, neighbors):
+        """the perfect-play move from state, or None for a draw or a finished game.
+
+        a won position takes the fastest win and a lost one holds out the longest.
+        """
+        value = self.probe(state)
+        mover = state[0] if state[2] else state[1]
+        if value == DRAW or not neighbors[mover] or self.goal_cell in state[:2]:
+            return None
+        best_move = None
+        best_value = None
+        for move in neighbors[mover]:
+            child = (move, state[1], False) if state[2] else (state[0], move, True)
+            child_value = self.probe(child)
+            # winning, only moves the opponent loses from count and -1 is the quickest loss;
+            # losing, every move is an opponent win and the highest value is the slowest one
+            if value > 0 and child_value >= 0:
+                continue
+            if best_value is None or child_value > best_value:
+                best_value = child_value
+                best_move = move
+        return best_move
@@ -0,0 +1,137 @@
+import random
+import time
+import unittest
+from GameSearch import GameSearch
+from MazeRunner import TurnBasedGame
+
+class FakeWindow:
+    """stands in for the tk window: after() callbacks are queued and run by pump()."""
+
+    def __init__(self):
+        self.pending = []
+        self.bindings = {}
+        self.destroyed = False
+
+    def bind(self, sequence, handler):
+        self.bindings[sequence] = handler
+
+    def protocol(self, name, handler):
+        self.bindings[name] = handler
+
+    def after(self, ms, callback, *args):
+        self.pending.append((callback, args))
+
+    def destroy(self):
+        self.destroyed = True
+
+    def pump(self, timeout=30):
+        deadline = time.perf_counter() + timeout
+        while self.pending and time.perf_counter() < deadline:
+            callback, args = self.pending.pop(0)
+            callback(*args)
+            time.sleep(0.001)
+
+class TestBackgroundSearch(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+        self.game = TurnBasedGame(20, headless=True)
+        self.game.maze._win = FakeWindow()
+        self.game.max.position = (1, 1)
+        self.game.min.position = (20, 30)
+        self.game.goal = (10, 15)
+        self.game.set_human_player(2)
+        self.game.current_player = self.game.max
+
+    def test_worker_move_matches_blocking_search(self):
+        self.game.depth = 4
+        expected = self.game.search_best_move()
+        self.game.start_ai_search()
+        self.assertEqual(self.game.turn_label.value, "max is thinking...")
+        self.game.maze._win.pump()
+        self.assertEqual(self.game.max.position, expected)
+        self.assertIs(self.game.current_player, self.game.min)
+        self.assertEqual(self.game.turn_label.value, "min's turn")
+        self.assertIsNone(self.game.ai_results)
+
+    def test_close_cancels_a_running_search(self):
+        self.game.depth = 40
+        self.game.game_search.search_method = "MM"
+        self.game.start_ai_search()
+        thread = self.game.ai_thread
+        time.sleep(0.05)
+        started = time.perf_counter()
+        self.game.close()
+        self.assertFalse(thread.is_alive())
+        self.assertLess(time.perf_counter() - started, 5)
+        self.game.maze._win.pump()
+        self.assertTrue(self.game.maze._win.destroyed)
+        self.assertEqual(self.game.max.position, (1, 1))
+        self.assertIs(self.game.current_player, self.game.max)
+
+    def test_cancel_before_the_search_starts(self):
+        self.game.depth = 40
+        for _ in range(20):
+            self.game.start_ai_search()
+            thread = self.game.ai_thread
+            self.game.cancel_ai_search()
+            self.assertFalse(thread.is_alive())
+            self.assertIsNone(self.game.ai_results)
+        self.game.maze._win.pump()
+        self.assertEqual(self.game.max.position, (1, 1))
+
+    def test_cancelled_search_does_not_stick(self):
+        self.game.game_search.cancel()
+        self.game.depth = 3
+        self.assertIsNotNone(self.game.search_best_move())
+
+    def human_to_move(self, depth):
+        self.game.depth = depth
+        self.game.current_player = self.game.min
+        self.game.start_pondering()
+        self.thread = self.game.ponder_thread
+
+    def test_pondered_answers_match_searches(self):
+        self.human_to_move(4)
+        self.thread.join()
+        state = self.game.get_current_state()
+        replies = {self.game.apply_move(state, move) for move in self.game.get_possible_moves(state)}
+        self.assertEqual(set(self.game.ponder_results), replies)
+        for reply, (move, stats) in self.game.ponder_results.items():
+            self.assertEqual(stats.source, "ponder")
+            self.assertEqual(GameSearch(self.game).get_best_move(state=reply), move)
+
+    def test_pondered_reply_is_played_at_once(self):
+        self.human_to_move(4)
+        self.thread.join()
+        moves = self.game.neighbors[self.game.cell_index((20, 30))]
+        self.game.min.position = self.game.cell_position(moves[0])
+        self.game.current_player = self.game.max
+        expected, _ = self.game.ponder_results[self.game.get_current_state()]
+        self.game.start_ai_search()
+        self.assertEqual(self.game.maze._win.pending, [])
+        self.assertEqual(self.game.max.position, expected)
+        self.assertEqual(self.game.game_stats.sources, {"ponder": 1})
+        self.assertIsNone(self.game.ponder_thread)
+
+    def test_stop_pondering_interrupts_the_search(self):
+        self.human_to_move(40)
+        time.sleep(0.05)
+        started = time.perf_counter()
+        self.assertIsNone(self.game.stop_pondering())
+        self.assertLess(time.perf_counter() - started, 5)
+        self.assertFalse(self.thread.is_alive())
+        self.assertEqual(self.game.ponder_results, {})
+
+    def test_arrow_keys_move_the_human(self):
+        self.game.enable_turn_based_control()
+        self.game.current_player = self.game.min
+        moves = self.game.neighbors[self.game.cell_index((20, 30))]
+        key, target = ('<Up>', (19, 30)) if self.game.cell_index((19, 30)) in moves else ('<Left>', (20, 29))
+        bindings = self.game.maze._win.bindings
+        bindings[key](None)
+        self.assertEqual(self.game.min.position, target)
+        self.assertEqual(bindings['WM_DELETE_WINDOW'], self.game.close)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import random
+import unittest
+from Evaluators import MazeDistanceEvaluator
+from GameSearch import GameSearch
+from MazeRunner import TurnBasedGame
+
+try:
+    from BatchedSearch import BatchedSearch
+except ImportError:  # numpy is optional
+    BatchedSearch = None
+
+@unittest.skipIf(BatchedSearch is None, "numpy is not installed")
+class TestBatchedSearch(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(2)
+        self.game = TurnBasedGame(20, headless=True)
+        self.game.depth = 8
+
+    def assertMatchesMinimax(self, evaluator=None):
+        sequential = GameSearch(self.game, evaluator=evaluator)
+        expected = sequential.get_best_move()
+        batched = GameSearch(self.game, evaluator=evaluator)
+        batched.engine = BatchedSearch()
+        self.assertEqual(batched.get_best_move(), expected)
+        self.assertEqual(batched.node_counter, sequential.node_counter)
+        self.assertEqual(batched.root_value, sequential.root_value)
+
+    def test_matches_minimax(self):
+        self.assertMatchesMinimax()
+
+    def test_matches_minimax_with_maze_distance(self):
+        self.assertMatchesMinimax(MazeDistanceEvaluator())
+
+    def test_matches_minimax_near_the_goal(self):
+        # terminal nodes inside the tree must not be expanded
+        goal = self.game.goal
+        neighbor = self.game.cell_position(self.game.neighbors[self.game.goal_cell][0])
+        self.game.set_manual_state(neighbor, (1, 1), goal)
+        self.game.current_player = self.game.min
+        self.assertMatchesMinimax()
+
+if __name__ == '__main__':
+    unittest.main()
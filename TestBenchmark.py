@@ -0,0 +1,34 @@
+import unittest
+from Benchmark import build_game, compare, run_suite
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_scenarios_are_reproducible(self):
+        first = build_game("10x10-perfect")
+        second = build_game("10x10-perfect")
+        self.assertEqual(first.neighbors, second.neighbors)
+        self.assertEqual(first.get_current_state(), second.get_current_state())
+        # a perfect maze is a tree: one fewer passage than cells
+        self.assertEqual(sum(len(cells) for cells in first.neighbors) // 2, 10 * 10 - 1)
+
+    def test_suite_records(self):
+        results = run_suite(["10x10-loops"], ["MM", "AB"], [4], repeat=1, log=lambda message: None)
+        self.assertEqual(len(results["results"]), 2)
+        for record in results["results"]:
+            for field in ("nodes", "pruned", "cutoffs", "seconds", "nodes_per_sec", "peak_kib"):
+                self.assertIn(field, record)
+        self.assertEqual(compare(results, results), [])
+
+    def test_compare_flags_regressions(self):
+        def document(nodes, seconds):
+            return {"results": [{"scenario": "10x10-loops", "evaluator": "manhattan", "method": "AB",
+                                 "depth": 6, "nodes": nodes, "seconds": seconds}]}
+        baseline = document(100, 1.0)
+        self.assertEqual(compare(baseline, document(100, 1.05)), [])
+        self.assertEqual(len(compare(baseline, document(100, 1.5))), 1)
+        self.assertEqual(len(compare(baseline, document(120, 1.0))), 1)
+        # too fast to time reliably
+        self.assertEqual(compare(document(100, 0.001), document(100, 0.003)), [])
+
+if __name__ == '__main__':
+    unittest.main()
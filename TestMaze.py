@@ -0,0 +1,152 @@
+import csv
+import os
+import random
+import tempfile
+import unittest
+from collections import deque
+from MazeRunner import TurnBasedGame
+from pyamaze import maze, convertMaze, EAST, WEST, NORTH, SOUTH
+
+def passages(m):
+    """set of open passages as frozensets of two cells, checking both sides agree."""
+    steps = {'E': (0, 1), 'W': (0, -1), 'N': (-1, 0), 'S': (1, 0)}
+    opposite = {'E': 'W', 'W': 'E', 'N': 'S', 'S': 'N'}
+    found = set()
+    for (x, y), walls in m.maze_map.items():
+        for direction, is_open in walls.items():
+            if is_open:
+                dx, dy = steps[direction]
+                other = (x + dx, y + dy)
+                assert m.maze_map[other][opposite[direction]] == 1
+                found.add(frozenset(((x, y), other)))
+    return found
+
+def reachable(m, start):
+    graph = {}
+    for edge in passages(m):
+        a, b = tuple(edge)
+        graph.setdefault(a, []).append(b)
+        graph.setdefault(b, []).append(a)
+    seen = {start}
+    frontier = deque([start])
+    while frontier:
+        for cell in graph.get(frontier.popleft(), []):
+            if cell not in seen:
+                seen.add(cell)
+                frontier.append(cell)
+    return seen
+
+class TestMaze(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+
+    def test_perfect_maze_is_a_spanning_tree(self):
+        for pattern in (None, 'h', 'v'):
+            m = maze(15, 25, headless=True)
+            m.CreateMaze(3, 4, pattern=pattern)
+            self.assertEqual(len(passages(m)), 15 * 25 - 1)
+            self.assertEqual(len(reachable(m, (1, 1))), 15 * 25)
+            self.assertEqual(len(m.path), 15 * 25 - 1)
+
+    def test_loops_add_passages(self):
+        m = maze(20, 30, headless=True)
+        m.CreateMaze(5, 5, loopPercent=100)
+        self.assertGreater(len(passages(m)), 20 * 30 - 1)
+        self.assertEqual(len(reachable(m, (1, 1))), 20 * 30)
+
+    def test_add_loops_to_an_existing_maze(self):
+        m = maze(20, 30, headless=True)
+        m.CreateMaze(5, 5)
+        tree = passages(m)
+        m.addLoops(50)
+        looped = passages(m)
+        self.assertTrue(tree < looped)
+        self.assertEqual(len(reachable(m, (1, 1))), 20 * 30)
+        # the path is recomputed through the new passages
+        cell = (20, 30)
+        while cell != (5, 5):
+            cell = m.path[cell]
+            self.assertIn(cell, m.maze_map)
+
+    def test_game_add_loops(self):
+        game = TurnBasedGame(10, headless=True, loop_percent=0)
+        game.game_search.get_best_move()
+        before = sum(len(cells) for cells in game.neighbors)
+        game.add_loops(100)
+        self.assertGreater(sum(len(cells) for cells in game.neighbors), before)
+        self.assertEqual(len(game.game_search.transposition_table), 0)
+
+    def test_walls_bitmask_and_maze_map_view(self):
+        m = maze(6, 9, headless=True)
+        m.CreateMaze(2, 3, loopPercent=50)
+        self.assertEqual(len(m.walls), 6 * 9)
+        bits = {'E': EAST, 'W': WEST, 'N': NORTH, 'S': SOUTH}
+        for (x, y), walls in m.maze_map.items():
+            mask = m.walls[(x - 1) * 9 + (y - 1)]
+            self.assertEqual(list(walls), ['E', 'W', 'N', 'S'])
+            for direction, bit in bits.items():
+                self.assertEqual(walls[direction], 1 if mask & bit else 0)
+        self.assertEqual(list(m.maze_map), m.grid)
+        self.assertNotIn((7, 1), m.maze_map)
+        with self.assertRaises(TypeError):
+            m.maze_map[1, 1]['E'] = 1
+        with self.assertRaises(TypeError):
+            m.maze_map[1, 1] = {}
+
+    def test_load_csv(self):
+        m = maze(5, 7, headless=True)
+        m.CreateMaze(1, 1, loopPercent=30)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "maze.csv")
+            with open(path, 'w', newline='') as handle:
+                writer = csv.writer(handle)
+                writer.writerow(['  cell  ', 'E', 'W', 'N', 'S'])
+                for cell, walls in m.maze_map.items():
+                    writer.writerow([cell, *walls.values()])
+            loaded = maze(headless=True)
+            loaded.CreateMaze(loadMaze=path)
+        self.assertEqual((loaded.rows, loaded.cols), (5, 7))
+        self.assertEqual(loaded.walls, m.walls)
+
+    def test_binary_round_trip(self):
+        m = maze(20, 30, headless=True)
+        m.CreateMaze(4, 9, loopPercent=40)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "maze.maze")
+            m.saveBinary(path)
+            loaded = maze(headless=True)
+            loaded.CreateMaze(loadMaze=path)
+            fast = maze.fromBinary(path)
+            with open(path, 'r+b') as handle:
+                handle.seek(-1, os.SEEK_END)
+                handle.write(b'\xff')
+            with self.assertRaises(ValueError):
+                maze.fromBinary(path)
+        for other in (loaded, fast):
+            self.assertEqual((other.rows, other.cols), (20, 30))
+            self.assertEqual(other.getGoal(), (4, 9))
+            self.assertEqual(other.walls, m.walls)
+        self.assertEqual(loaded.path, m.path)
+
+    def test_convert_csv(self):
+        m = maze(5, 7, headless=True)
+        m.CreateMaze(1, 1, loopPercent=30)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "maze.csv")
+            with open(path, 'w', newline='') as handle:
+                writer = csv.writer(handle)
+                writer.writerow(['  cell  ', 'E', 'W', 'N', 'S'])
+                for cell, walls in m.maze_map.items():
+                    writer.writerow([cell, *walls.values()])
+            converted = maze.fromBinary(convertMaze(path, goal=(2, 3)))
+        self.assertEqual(converted.walls, m.walls)
+        self.assertEqual(converted.getGoal(), (2, 3))
+
+    def test_large_maze(self):
+        m = maze(200, 200, headless=True)
+        m.CreateMaze()
+        self.assertEqual(len(passages(m)), 200 * 200 - 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from MazeCorpus import MazeCorpus, build_corpus, generate_maze
+
+class TestMazeCorpus(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def build(self, name, workers, count=7, shard_size=3):
+        return build_corpus(os.path.join(self.directory.name, name), count, sizes=[(5, 5), (6, 8)],
+                            loop_percents=[0, 50], seed=3, shard_size=shard_size, workers=workers)
+
+    def test_same_corpus_whatever_the_worker_count(self):
+        with self.build("one", 1) as one, self.build("three", 3) as three:
+            self.assertEqual(len(one), 7)
+            self.assertEqual(len(one.manifest["shards"]), 3)
+            for first, second in zip(one, three):
+                self.assertEqual(first.toBytes(), second.toBytes())
+
+    def test_global_random_state_is_left_alone(self):
+        random.seed(11)
+        expected = random.random()
+        random.seed(11)
+        generate_maze(6, 8, 50, "3:1")
+        self.assertEqual(random.random(), expected)
+
+    def test_random_access_matches_generation(self):
+        with self.build("corpus", 2) as corpus:
+            for number in (0, 2, 3, 6, -1):
+                spec = corpus.spec(number % len(corpus))
+                expected = generate_maze(*spec)
+                found = corpus[number]
+                self.assertEqual((found.rows, found.cols), spec[:2])
+                self.assertEqual(found._goal, expected._goal)
+                self.assertEqual(found.toBytes(), expected.toBytes())
+            with self.assertRaises(IndexError):
+                corpus[7]
+
+    def test_iteration_streams_every_maze_in_order(self):
+        with self.build("corpus", 2) as corpus:
+            streamed = [generated.toBytes() for generated in corpus]
+            self.assertEqual(streamed, [corpus[number].toBytes() for number in range(len(corpus))])
+
+    def test_rebuild_keeps_finished_shards(self):
+        corpus = self.build("corpus", 1)
+        corpus.close()
+        first = os.path.join(self.directory.name, "corpus", corpus.manifest["shards"][0])
+        os.remove(os.path.join(self.directory.name, "corpus", corpus.manifest["shards"][1]))
+        written = os.path.getmtime(first)
+        with self.build("corpus", 1) as rebuilt:
+            self.assertEqual(os.path.getmtime(first), written)
+            self.assertEqual(rebuilt[4].toBytes(), generate_maze(*rebuilt.spec(4)).toBytes())
+
+    def test_rebuild_with_other_settings_is_refused(self):
+        self.build("corpus", 1).close()
+        with self.assertRaises(ValueError):
+            build_corpus(os.path.join(self.directory.name, "corpus"), 7, sizes=[(5, 5), (6, 8)],
+                         loop_percents=[0, 50], seed=4, shard_size=3, workers=1)
+        with MazeCorpus(os.path.join(self.directory.name, "corpus")) as corpus:
+            self.assertEqual(corpus.manifest["seed"], 3)
+            self.assertEqual(corpus[5].toBytes(), generate_maze(*corpus.spec(5)).toBytes())
+
+    def test_growing_count_completes_the_last_shard(self):
+        self.build("corpus", 1, count=7).close()
+        self.build("corpus", 1, count=8).close()
+        with MazeCorpus(os.path.join(self.directory.name, "corpus")) as corpus:
+            self.assertEqual(len(corpus), 8)
+            self.assertEqual(corpus[7].toBytes(), generate_maze(*corpus.spec(7)).toBytes())
+
+    def test_short_shard_is_reported(self):
+        directory = os.path.join(self.directory.name, "corpus")
+        self.build("corpus", 1, count=7).close()
+        with open(os.path.join(directory, "corpus.json")) as handle:
+            manifest = json.load(handle)
+        manifest["count"] = 9
+        with open(os.path.join(directory, "corpus.json"), "w") as handle:
+            json.dump(manifest, handle)
+        with MazeCorpus(directory) as corpus:
+            with self.assertRaises(ValueError):
+                corpus[7]
+
+if __name__ == '__main__':
+    unittest.main()
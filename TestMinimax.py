@@ -1,12 +1,16 @@
+import random
+import time
 import unittest
-from GameSearch import GameSearch
+from Evaluators import ManhattanEvaluator, MazeDistanceEvaluator
+from GameSearch import GameSearch, Position
 from MazeRunner import TurnBasedGame
 
 class TestMinimax(unittest.TestCase):
 
     def setUp(self):
         # Set up a controlled game environment for testing
-        self.game = TurnBasedGame()
+        random.seed(0)
+        self.game = TurnBasedGame(10, headless=True)
         self.game_search = GameSearch(self.game)
 
         # Manually set the initial positions for Max and Min for controlled tests
@@ -19,36 +23,129 @@ class TestMinimax(unittest.TestCase):
 
     def test_minimax_terminal_state(self):
         # Test a terminal state where Max wins
-        state = {
-            'max_position': (1, 1),
-            'min_position': (2, 5),
-            'goal': (1, 1),
-            'current_player': self.game.max
-        }
+        state = self.game.make_state((1, 1), (2, 5), True)
         result = self.game_search.minimax(state, self.game.depth, True)
         self.assertEqual(result, float('inf'))  # Max should win, so result should be positive infinity
 
     def test_minimax_non_terminal_state(self):
         # Test a non-terminal state where the AI has to choose a move
-        state = {
-            'max_position': (8, 1),
-            'min_position': (4, 7),
-            'goal': (1, 1),
-            'current_player': self.game.min
-        }
-        best_move = self.game_search.minimax(state, self.game.depth, False)
+        state = self.game.make_state((8, 1), (4, 7), False)
+        best_move = self.game.cell_position(self.game_search.minimax(state, self.game.depth, False))
         self.assertIn(best_move, [(4, 6), (5,7)])  # The best moves should be one of these based on the heuristic
 
+    def test_terminal_root_has_no_best_move(self):
+        self.game.max.position = (5, 3)
+        self.game.min.position = (1, 1)
+        self.game.current_player = self.game.max
+        for options in ({}, {"alphaBeta": True}, {"pvs": True}, {"max_depth": 3}):
+            self.assertIsNone(self.game_search.get_best_move(**options))
+        state = self.game.get_current_state()
+        self.assertIsNone(self.game_search.deepen(state, [1, 2], alphaBeta=True))
+
     def test_evaluate_state(self):
         # Test the evaluation function separately
-        state = {
-            'max_position': (8, 1),
-            'min_position': (4, 7),
-            'goal': (1, 1),
-            'current_player': self.game.min
-        }
+        state = self.game.make_state((8, 1), (4, 7), False)
         heuristic = self.game_search.evaluate_state(state)
-        self.assertEqual(heuristic, 3)  # Expected heuristic value for this state
+        self.assertEqual(heuristic, 2)  # min is 9 steps from the goal, max is 7
+
+    def test_apply_move_returns_new_state(self):
+        state = self.game.make_state((8, 1), (4, 7), True)
+        child = self.game.apply_move(state, self.game.cell_index((7, 1)))
+        self.assertEqual(child, self.game.make_state((7, 1), (4, 7), False))
+        grandchild = self.game.apply_move(child, self.game.cell_index((4, 6)))
+        self.assertEqual(grandchild, self.game.make_state((7, 1), (4, 6), True))
+        self.assertEqual(hash(child), hash(self.game.make_state((7, 1), (4, 7), False)))
+
+    def test_possible_moves_follow_search_state(self):
+        # moves come from the cell in the state, not from the live agent positions
+        state = self.game.make_state((8, 1), (4, 7), False)
+        moves = [self.game.cell_position(cell) for cell in self.game.get_possible_moves(state)]
+        walls = self.game.maze.maze_map[(4, 7)]
+        expected = [(3, 7)] * walls['N'] + [(4, 6)] * walls['W'] + [(4, 8)] * walls['E'] + [(5, 7)] * walls['S']
+        self.assertEqual(moves, expected)
+
+    def test_iterative_deepening_matches_fixed_depth(self):
+        self.game.depth = 4
+        fixed = self.game_search.get_best_move()
+        deepened = self.game_search.get_best_move(max_depth=4)
+        self.assertEqual(fixed, deepened)
+        self.assertEqual(self.game_search.completed_depth, 4)
+
+    def test_time_budget_returns_completed_move(self):
+        start = time.perf_counter()
+        move = self.game_search.get_best_move(alphaBeta=True, time_budget_ms=50)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertGreaterEqual(self.game_search.completed_depth, 1)
+        moves = self.game.get_possible_moves(self.game.get_current_state())
+        self.assertIn(move, [self.game.cell_position(cell) for cell in moves])
+
+    def test_move_ordering_hash_then_killer(self):
+        state = self.game.make_state((8, 1), (4, 7), True)
+        moves = list(self.game.get_possible_moves(state))
+        self.assertEqual(sorted(self.game_search.order_moves(state, 0)), sorted(moves))
+        if len(moves) >= 2:
+            self.game_search.killers[0][0] = moves[0]
+            self.assertEqual(self.game_search.order_moves(state, 0, hash_move=moves[-1])[:2],
+                             [moves[-1], moves[0]])
+
+    def test_alpha_beta_reports_first_move_cutoffs(self):
+        self.game.depth = 6
+        self.game_search.get_best_move(alphaBeta=True)
+        self.assertGreater(self.game_search.cutoffs, 0)
+        self.assertLessEqual(self.game_search.first_move_cutoffs, self.game_search.cutoffs)
+        self.assertGreater(self.game_search.first_move_cutoff_rate(), 0.5)
+
+    def test_pvs_matches_alpha_beta(self):
+        self.game.depth = 7
+        alpha_beta_move = self.game_search.get_best_move(alphaBeta=True)
+        alpha_beta_value = self.game_search.root_value
+        pvs_move = self.game_search.get_best_move(pvs=True)
+        self.assertEqual(pvs_move, alpha_beta_move)
+        self.assertEqual(self.game_search.root_value, alpha_beta_value)
+        # fixed depth is a single pass, aspiration windows only come with deepening
+        self.assertEqual(len(self.game_search.last_stats.iterations), 1)
+        self.assertEqual(self.game_search.get_best_move(pvs=True, max_depth=7), alpha_beta_move)
+        self.assertEqual(len(self.game_search.last_stats.iterations), 7)
+
+    def test_position_make_unmake_round_trip(self):
+        state = self.game.make_state((8, 1), (4, 7), False)
+        position = Position(state, 2)
+        position.make_move(self.game.cell_index((4, 6)), 0)
+        self.assertEqual(position.state(), self.game.make_state((8, 1), (4, 6), True))
+        position.make_move(self.game.cell_index((7, 1)), 1)
+        self.assertEqual(position.state(), self.game.make_state((7, 1), (4, 6), False))
+        position.unmake_move(1)
+        position.unmake_move(0)
+        self.assertEqual(position.state(), state)
+
+    def test_maze_distance_field(self):
+        manhattan = ManhattanEvaluator().distance_field(self.game)
+        maze_distance = MazeDistanceEvaluator().distance_field(self.game)
+        goal_cell = self.game.goal_cell
+        self.assertEqual(maze_distance[goal_cell], 0)
+        for cell, neighbors in enumerate(self.game.neighbors):
+            self.assertGreaterEqual(maze_distance[cell], manhattan[cell])  # walls only make paths longer
+            if cell != goal_cell:
+                self.assertEqual(maze_distance[cell], 1 + min(maze_distance[n] for n in neighbors))
+
+    def test_distance_field_follows_goal(self):
+        self.game_search.set_evaluator(MazeDistanceEvaluator())
+        state = self.game.make_state((8, 1), (4, 7), False)
+        before = self.game_search.evaluate_state(state)
+        self.game.set_manual_state((8, 1), (4, 7), (8, 2))
+        self.assertEqual(self.game_search.goal_distances()[self.game.goal_cell], 0)
+        self.assertNotEqual(self.game_search.evaluate_state(state), before)
+
+    def test_headless_game_has_no_window(self):
+        self.assertIsNone(self.game.maze._win)
+        self.assertEqual(self.game.max.position, (5, 3))
+
+    def test_headless_ai_vs_ai_game(self):
+        game = TurnBasedGame(10, headless=True)
+        game.depth = 2
+        # the seeded maze is a race max wins well inside the move cap
+        self.assertIs(game.play(max_turns=50), game.max)
+        self.assertEqual(game.winner.position, game.goal)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,71 @@
+import pickle
+import random
+import unittest
+from GameSearch import GameSearch
+from MazeRunner import TurnBasedGame
+from ParallelSearch import GameSnapshot, LazySMPSearch, RootSplitSearch
+
+class TestRootSplitSearch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.parallel = RootSplitSearch(workers=2, split_plies=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.parallel.close()
+
+    def setUp(self):
+        random.seed(1)
+        self.game = TurnBasedGame(10, headless=True)
+        self.game.depth = 6
+
+    def test_snapshot_round_trips_through_pickle(self):
+        snapshot = pickle.loads(pickle.dumps(GameSnapshot.from_game(self.game)))
+        self.assertEqual(snapshot.neighbors, tuple(self.game.neighbors))
+        self.assertEqual(snapshot.goal_cell, self.game.goal_cell)
+
+    def test_matches_sequential_minimax(self):
+        sequential = GameSearch(self.game)
+        expected = sequential.get_best_move()
+        search = GameSearch(self.game)
+        search.engine = self.parallel
+        self.assertEqual(search.get_best_move(), expected)
+        self.assertEqual(search.node_counter, sequential.node_counter)
+        self.assertEqual(search.get_best_move(alphaBeta=True), expected)
+
+class TestLazySMPSearch(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(1)
+        self.game = TurnBasedGame(10, headless=True)
+        self.game.depth = 6
+        self.legal_moves = [self.game.cell_position(cell)
+                            for cell in self.game.get_possible_moves(self.game.get_current_state())]
+
+    def test_fixed_depth_returns_deepest_legal_move(self):
+        with LazySMPSearch(workers=2, table_size=1 << 12) as parallel:
+            search = GameSearch(self.game)
+            search.engine = parallel
+            self.assertIn(search.get_best_move(alphaBeta=True), self.legal_moves)
+            self.assertEqual(search.completed_depth, 6)
+
+    def test_minimax_runs_a_single_search(self):
+        sequential = GameSearch(self.game)
+        expected = sequential.get_best_move()
+        with LazySMPSearch(workers=2, table_size=1 << 12) as parallel:
+            search = GameSearch(self.game)
+            search.engine = parallel
+            self.assertEqual(search.get_best_move(), expected)
+            self.assertEqual(search.node_counter, sequential.node_counter)
+            self.assertIsNone(parallel.pool)
+
+    def test_time_budget(self):
+        with LazySMPSearch(workers=2, table_size=1 << 12) as parallel:
+            search = GameSearch(self.game)
+            search.engine = parallel
+            self.assertIn(search.get_best_move(alphaBeta=True, time_budget_ms=50), self.legal_moves)
+            self.assertGreaterEqual(search.completed_depth, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+import os
+import random
+import tempfile
+import unittest
+from GameSearch import GameSearch
+from MazeRunner import TurnBasedGame
+from PositionCache import PositionCache, position_key, HEADER, RECORD
+
+try:
+    from Tablebase import Tablebase, DRAW
+except ImportError:  # numpy is optional
+    Tablebase = None
+
+class FirstMoveEngine:
+    """stand-in engine that plays the mover's first neighbor."""
+
+    supports_time_budget = False
+
+    def search(self, game_search, state, depth, pruning, time_budget_ms=None):
+        return game_search.game.neighbors[state[0] if state[2] else state[1]][0]
+
+class TestPositionCache(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+        self.game = TurnBasedGame(10, headless=True)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "positions.cache")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def key(self, number):
+        return position_key(b"\0" * 20, 0, (number, 1, True), 5, "AB", "manhattan")
+
+    def test_put_get_and_reopen(self):
+        with PositionCache(self.path) as cache:
+            cache.put(self.key(1), 7, 2.5)
+            cache.put(self.key(2), None, None)
+            self.assertEqual(cache.get(self.key(1)), (7, 2.5))
+        with PositionCache(self.path, readonly=True) as cache:
+            self.assertEqual(cache.get(self.key(1)), (7, 2.5))
+            self.assertEqual(cache.get(self.key(2)), (None, None))
+            self.assertIsNone(cache.get(self.key(3)))
+
+    def test_reader_sees_appends_after_refresh(self):
+        with PositionCache(self.path) as writer, PositionCache(self.path, readonly=True) as reader:
+            writer.put(self.key(1), 3, 1.0)
+            self.assertIsNone(reader.get(self.key(1)))
+            reader.refresh()
+            self.assertEqual(reader.get(self.key(1)), (3, 1.0))
+            reader.put(self.key(2), 3, 1.0)  # read-only caches never write
+            self.assertEqual(os.path.getsize(self.path), len(HEADER) + RECORD.size)
+
+    def test_torn_record_is_ignored(self):
+        with PositionCache(self.path) as cache:
+            cache.put(self.key(1), 3, 1.0)
+        with open(self.path, 'ab') as handle:
+            handle.write(b"partial")
+        with PositionCache(self.path, readonly=True) as cache:
+            self.assertEqual(len(cache), 1)
+
+    def test_size_cap_keeps_newest_entries(self):
+        with PositionCache(self.path, max_entries=8) as cache:
+            for number in range(20):
+                cache.put(self.key(number), number, float(number))
+            self.assertLessEqual(cache.records, 8)
+            self.assertEqual(cache.get(self.key(19)), (19, 19.0))
+            self.assertIsNone(cache.get(self.key(0)))
+        with PositionCache(self.path, readonly=True) as cache:
+            self.assertEqual(cache.get(self.key(19)), (19, 19.0))
+
+    def test_reopening_reads_the_index_not_the_records(self):
+        with PositionCache(self.path) as cache:
+            for number in range(50):
+                cache.put(self.key(number), number, float(number))
+        self.assertTrue(os.path.exists(self.path + ".idx"))
+        with PositionCache(self.path, readonly=True) as cache:
+            self.assertEqual(cache.unindexed, {})
+            self.assertEqual(len(cache), 50)
+            self.assertEqual(cache.get(self.key(42)), (42, 42.0))
+
+    def test_missing_or_foreign_index_is_not_trusted(self):
+        with PositionCache(self.path) as cache:
+            cache.put(self.key(1), 1, 1.0)
+        other = os.path.join(self.directory.name, "other.cache")
+        with PositionCache(other) as cache:
+            cache.put(self.key(2), 2, 2.0)
+        os.replace(other + ".idx", self.path + ".idx")
+        with PositionCache(self.path, readonly=True) as cache:
+            self.assertEqual(cache.get(self.key(1)), (1, 1.0))
+            self.assertIsNone(cache.get(self.key(2)))
+        with PositionCache(self.path) as cache:  # the writer rebuilds it
+            self.assertEqual(cache.get(self.key(1)), (1, 1.0))
+        with PositionCache(self.path, readonly=True) as cache:
+            self.assertEqual(cache.unindexed, {})
+
+    def test_reader_reopens_after_compaction(self):
+        with PositionCache(self.path, max_entries=8) as writer, \
+                PositionCache(self.path, readonly=True) as reader:
+            for number in range(8):
+                writer.put(self.key(number), number, float(number))
+            reader.refresh()
+            self.assertEqual(reader.get(self.key(0)), (0, 0.0))
+            writer.put(self.key(8), 8, 8.0)  # compacts down to the newest half first
+            reader.refresh()
+            self.assertIsNone(reader.get(self.key(0)))
+            self.assertEqual(reader.get(self.key(8)), (8, 8.0))
+            self.assertEqual(reader.records, writer.records)
+
+    def test_search_results_are_reused(self):
+        search = GameSearch(self.game)
+        search.position_cache = PositionCache(self.path)
+        expected = search.get_best_move(alphaBeta=True)
+        expected_value = search.root_value
+        self.assertGreater(search.node_counter, 0)
+
+        other = GameSearch(self.game)
+        other.position_cache = PositionCache(self.path, readonly=True)
+        self.assertEqual(other.get_best_move(alphaBeta=True), expected)
+        self.assertEqual(other.node_counter, 0)
+        self.assertEqual(other.root_value, expected_value)
+        # a different method or depth is a different entry
+        self.game.depth += 1
+        other.get_best_move(alphaBeta=True)
+        self.assertGreater(other.node_counter, 0)
+        search.position_cache.close()
+        other.position_cache.close()
+
+    def test_engine_results_are_kept_apart(self):
+        search = GameSearch(self.game)
+        search.position_cache = PositionCache(self.path)
+        search.engine = FirstMoveEngine()
+        search.get_best_move(alphaBeta=True)
+        self.assertEqual(search.position_cache.records, 1)
+        search.engine = None
+        search.get_best_move(alphaBeta=True)
+        self.assertGreater(search.node_counter, 0)
+        search.position_cache.close()
+
+    @unittest.skipIf(Tablebase is None, "numpy is not installed")
+    def test_tablebase_results_are_kept_apart(self):
+        state = self.game.get_current_state()
+        tablebase = Tablebase.solve(self.game)
+        # a drawn root is searched, with the tablebase scoring the leaves
+        tablebase.values[tablebase.index(state)] = DRAW
+        search = GameSearch(self.game)
+        search.position_cache = PositionCache(self.path)
+        search.set_tablebase(tablebase)
+        search.get_best_move(alphaBeta=True)
+        self.assertGreater(search.node_counter, 0)
+        self.assertEqual(search.position_cache.records, 1)
+
+        other = GameSearch(self.game)
+        other.position_cache = PositionCache(self.path, readonly=True)
+        other.get_best_move(alphaBeta=True)
+        self.assertGreater(other.node_counter, 0)
+        self.assertEqual(other.position_cache.hits, 0)
+        search.position_cache.close()
+        other.position_cache.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from GameSearch import GameSearch
+from MazeRunner import TurnBasedGame
+from SearchHooks import SearchHooks, TreeTracer
+
+class CountingHooks(SearchHooks):
+
+    def __init__(self):
+        self.entered = 0
+        self.exited = 0
+        self.leaves = 0
+        self.cutoffs = 0
+        self.chosen = []
+
+    def node_enter(self, state, depth, ply, alpha, beta):
+        self.entered += 1
+
+    def node_exit(self, state, depth, ply, value, nodes):
+        self.exited += 1
+
+    def leaf(self, state, value):
+        self.leaves += 1
+
+    def cutoff(self, max_to_move, from_cell, move, ply, depth, index):
+        self.cutoffs += 1
+
+    def move_chosen(self, state, move, stats):
+        self.chosen.append(move)
+
+class TestSearchHooks(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+        self.game = TurnBasedGame(10, headless=True)
+        self.game.depth = 6
+
+    def test_hooks_see_every_node(self):
+        hooks = CountingHooks()
+        search = GameSearch(self.game, hooks=hooks)
+        move = search.get_best_move(alphaBeta=True)
+        stats = search.last_stats
+        self.assertEqual(hooks.entered, stats.nodes)
+        self.assertEqual(hooks.exited, stats.nodes)
+        self.assertEqual(hooks.leaves, stats.evaluations)
+        self.assertEqual(hooks.cutoffs, stats.cutoffs)
+        self.assertEqual(hooks.chosen, [self.game.cell_index(move)])
+
+    def test_hooks_do_not_change_the_search(self):
+        plain = GameSearch(self.game)
+        expected = plain.get_best_move(alphaBeta=True)
+        traced = GameSearch(self.game)
+        with traced.hooked(CountingHooks()):
+            self.assertEqual(traced.get_best_move(alphaBeta=True), expected)
+        self.assertEqual(traced.node_counter, plain.node_counter)
+        self.assertEqual(traced.root_value, plain.root_value)
+
+    def test_detach_restores_the_plain_kernel(self):
+        search = GameSearch(self.game)
+        with search.hooked(CountingHooks()):
+            self.assertIn('negamax', vars(search))
+        self.assertNotIn('negamax', vars(search))
+        self.assertNotIn('record_cutoff', vars(search))
+        self.assertIsNone(search.hooks)
+
+    def test_tree_tracer(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.jsonl")
+            search = GameSearch(self.game)
+            with TreeTracer(path, max_ply=2) as tracer, search.hooked(tracer):
+                search.get_best_move(alphaBeta=True)
+            with open(path) as handle:
+                records = [json.loads(line) for line in handle]
+        nodes = [record for record in records if "ply" in record]
+        self.assertLessEqual(max(record["ply"] for record in nodes), 2)
+        root = [record for record in nodes if record["ply"] == 0]
+        self.assertEqual(len(root), 1)
+        self.assertEqual(root[0]["nodes"], search.node_counter)
+        self.assertEqual(records[-1]["nodes"], search.node_counter)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import random
+import unittest
+from MazeRunner import TurnBasedGame
+from SearchStats import GameStats
+
+class TestSearchStats(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+        self.game = TurnBasedGame(10, headless=True)
+        self.game.depth = 6
+        self.search = self.game.game_search
+
+    def test_counters_add_up(self):
+        self.search.get_best_move(alphaBeta=True)
+        stats = self.search.last_stats
+        self.assertEqual(stats.source, "search")
+        self.assertEqual(stats.method, "AB")
+        self.assertEqual(stats.depth, 6)
+        self.assertEqual(stats.nodes, self.search.node_counter)
+        self.assertEqual(sum(stats.nodes_per_ply), stats.nodes)
+        self.assertEqual(stats.nodes_per_ply[0], 1)
+        self.assertEqual(stats.leaf_nodes + stats.interior_nodes, stats.nodes)
+        self.assertEqual(sum(stats.cutoffs_per_ply), stats.cutoffs)
+        self.assertEqual(sum(stats.cutoff_index_histogram), stats.cutoffs)
+        self.assertEqual(stats.cutoff_index_histogram[0], stats.first_move_cutoffs)
+        self.assertEqual(stats.iterations[0][:2], (6, stats.nodes))
+        self.assertGreater(stats.effective_branching_factor, 1)
+        self.assertGreater(stats.tt_misses, 0)
+        self.assertIn("nodes per ply", stats.report())
+
+    def test_counters_reset_between_searches(self):
+        self.search.get_best_move(alphaBeta=True)
+        self.search.get_best_move(alphaBeta=True)
+        stats = self.search.last_stats
+        # pruned_nodes used to carry over from earlier searches
+        self.assertEqual(stats.pruned_nodes, stats.cutoffs)
+        self.assertEqual(sum(stats.nodes_per_ply), stats.nodes)
+        self.assertEqual(sum(stats.cutoff_index_histogram), stats.cutoffs)
+
+    def test_iterations_are_recorded(self):
+        self.search.get_best_move(alphaBeta=True, max_depth=4)
+        stats = self.search.last_stats
+        self.assertEqual([iteration[0] for iteration in stats.iterations], [1, 2, 3, 4])
+        self.assertEqual(sum(iteration[1] for iteration in stats.iterations), stats.nodes)
+
+    def test_game_totals(self):
+        self.game.play(max_turns=4)
+        totals = self.game.game_stats
+        self.assertGreater(totals.searches, 0)
+        self.assertEqual(sum(totals.nodes_per_ply), totals.totals["nodes"])
+        merged = GameStats()
+        merged.add(self.search.last_stats)
+        merged.add(self.search.last_stats)
+        self.assertEqual(merged.totals["nodes"], 2 * self.search.last_stats.nodes)
+        self.assertEqual(merged.as_dict()["searches"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import random
+import tempfile
+import unittest
+from Evaluators import MazeDistanceEvaluator
+from GameSearch import GameSearch, TABLEBASE_WIN
+from MazeRunner import TurnBasedGame
+
+try:
+    from Tablebase import Tablebase
+except ImportError:  # numpy is optional
+    Tablebase = None
+
+@unittest.skipIf(Tablebase is None, "numpy is not installed")
+class TestTablebase(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+        self.game = TurnBasedGame(10, headless=True)
+        self.tablebase = Tablebase.solve(self.game)
+
+    def test_matches_the_race_to_the_goal(self):
+        # nobody can block anyone, so the side to move wins exactly when it is no further away
+        distances = MazeDistanceEvaluator().distance_field(self.game)
+        cells = self.game.rows * self.game.cols
+        for max_cell in range(cells):
+            for min_cell in range(cells):
+                if self.game.goal_cell in (max_cell, min_cell):
+                    continue
+                for max_to_move in (True, False):
+                    mover, other = (max_cell, min_cell) if max_to_move else (min_cell, max_cell)
+                    if distances[mover] <= distances[other]:
+                        expected = 2 * distances[mover]  # a win in 2d - 1 plies
+                    else:
+                        expected = -(2 * distances[other] + 1)  # a loss in 2d plies
+                    self.assertEqual(self.tablebase.probe((max_cell, min_cell, max_to_move)), expected)
+
+    def test_terminal_positions(self):
+        goal_cell = self.game.goal_cell
+        self.assertEqual(self.tablebase.probe((goal_cell, 0, False)), -1)
+        self.assertEqual(self.tablebase.probe((0, goal_cell, False)), 1)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "maze.tb")
+            self.tablebase.save(path)
+            loaded = Tablebase.load(path)
+            self.assertTrue(loaded.matches(self.game))
+            self.assertEqual(loaded.values.tolist(), self.tablebase.values.tolist())
+            del loaded
+
+    def test_root_probe_plays_the_fastest_win(self):
+        search = GameSearch(self.game)
+        search.set_tablebase(self.tablebase)
+        distances = MazeDistanceEvaluator().distance_field(self.game)
+        move = self.game.cell_index(search.get_best_move())
+        self.assertEqual(search.node_counter, 0)
+        self.assertEqual(distances[move], distances[self.game.get_current_state()[0]] - 1)
+        self.assertGreater(search.root_value, TABLEBASE_WIN - 2 * self.game.rows * self.game.cols)
+
+    def test_leaf_probe_agrees_with_deeper_search(self):
+        # a shallow search that sees tablebase leaves scores the position as the table does
+        search = GameSearch(self.game)
+        search.set_tablebase(self.tablebase)
+        state = self.game.get_current_state()
+        value = search.search_value(state, 1)
+        self.assertGreater(abs(value), TABLEBASE_WIN // 2)
+        self.assertEqual(value > 0, self.tablebase.probe(state) > 0)
+
+    def test_ignored_for_another_goal(self):
+        search = GameSearch(self.game)
+        search.set_tablebase(self.tablebase)
+        self.game.goal = (1, 1)
+        self.assertIsNone(search.active_tablebase())
+
+    def test_rejects_another_maze(self):
+        random.seed(1)
+        other = TurnBasedGame(10, headless=True)
+        with self.assertRaises(ValueError):
+            GameSearch(other).set_tablebase(self.tablebase)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import json
+import os
+import tempfile
+import unittest
+from Tournament import parse_engine, play_game, read_results, run_tournament, schedule, summarize
+
+class TestTournament(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "results.jsonl")
+        self.settings = {"corpus": None, "sizes": [[5, 5]], "loop_percents": [30], "seed": 2,
+                         "tt_size": 1 << 10, "max_plies": 200}
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_small(self, mazes=2, **options):
+        return run_tournament(self.path, ["MM:2", "AB:3:maze"], mazes, sizes=[(5, 5)], loop_percents=[30],
+                              seed=2, tt_size=1 << 10, max_plies=200, workers=2, log=lambda message: None,
+                              **options)
+
+    def test_parse_engine(self):
+        self.assertEqual(parse_engine("ab"), {"label": "AB:5:manhattan", "method": "AB", "depth": 5,
+                                              "evaluator": "manhattan"})
+        self.assertEqual(parse_engine("PVS:7:maze")["label"], "PVS:7:maze")
+        for label in ("XX:3", "AB:0", "AB:3:nope"):
+            with self.assertRaises(ValueError):
+                parse_engine(label)
+
+    def test_schedule_plays_both_colours(self):
+        games = list(schedule(["a", "b", "c"], 2))
+        self.assertEqual([game[0] for game in games], list(range(12)))
+        self.assertIn((0, 0, "a", "b"), games)
+        self.assertIn((1, 0, "b", "a"), games)
+
+    def test_games_replay_identically(self):
+        first = play_game(0, 1, "AB:3:maze", "MM:2:manhattan", self.settings)
+        second = play_game(0, 1, "AB:3:maze", "MM:2:manhattan", self.settings)
+        for record in (first, second):
+            for side in ("max", "min"):
+                del record[side]["seconds"]
+        self.assertEqual(first, second)
+        self.assertIn(first["winner"], ("max", "min"))
+        self.assertEqual(first["max"]["moves"] + first["min"]["moves"], first["plies"])
+
+    def test_start_on_the_goal_is_redrawn(self):
+        # maze 2 of these settings first draws min onto its goal
+        result = play_game(0, 2, "AB:3:maze", "MM:2:manhattan", self.settings)
+        self.assertIn(result["winner"], ("max", "min"))
+        self.assertGreater(result["plies"], 0)
+
+    def test_resume_after_interruption(self):
+        complete = self.run_small()
+        self.assertEqual(len(complete), 4)
+        with open(self.path) as handle:
+            lines = handle.read().splitlines(True)
+        # keep the header and one game, plus half of the next line as an interrupted write would
+        with open(self.path, "w") as handle:
+            handle.write(lines[0] + lines[1] + lines[2][:10])
+        resumed = self.run_small()
+        self.assertEqual(sorted(result["game"] for result in resumed), [0, 1, 2, 3])
+        self.assertEqual(len(read_results(self.path, json.loads(lines[0])["tournament"])), 4)
+
+    def test_other_settings_do_not_resume(self):
+        self.run_small(mazes=1)
+        with self.assertRaises(ValueError):
+            self.run_small(mazes=3)
+
+    def test_summarize(self):
+        results = [{"winner": "max", "plies": 5,
+                    "max": {"engine": "a", "moves": 3, "seconds": 0.3, "nodes": 30},
+                    "min": {"engine": "b", "moves": 2, "seconds": 0.1, "nodes": 10}},
+                   {"winner": None, "plies": 4,
+                    "max": {"engine": "b", "moves": 2, "seconds": 0.1, "nodes": 10},
+                    "min": {"engine": "a", "moves": 2, "seconds": 0.2, "nodes": 20}}]
+        summary = summarize(results)
+        self.assertEqual((summary["a"]["wins"], summary["a"]["draws"], summary["a"]["games"]), (1, 1, 2))
+        self.assertAlmostEqual(summary["a"]["win_rate"], 0.75)
+        self.assertAlmostEqual(summary["b"]["win_rate"], 0.25)
+        self.assertAlmostEqual(summary["a"]["ms_per_move"], 100)
+        self.assertAlmostEqual(summary["a"]["nodes_per_move"], 10)
+        self.assertAlmostEqual(summary["a"]["mean_plies"], 4.5)
+
+if __name__ == '__main__':
+    unittest.main()
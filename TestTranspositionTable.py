@@ -0,0 +1,107 @@
+import random
+import unittest
+from GameSearch import GameSearch
+from MazeRunner import TurnBasedGame
+from TranspositionTable import ZobristKeys, TranspositionTable, SharedTranspositionTable, EXACT, LOWER_BOUND
+
+class InterleavedWords:
+    """wraps a shared table's words and runs another process's store just before one word is read or written."""
+
+    def __init__(self, words, word, interleave, on_write):
+        self.words = words
+        self.word = word
+        self.interleave = interleave
+        self.on_write = on_write
+
+    def run(self, index, writing):
+        if index == self.word and writing == self.on_write and self.interleave:
+            interleave, self.interleave = self.interleave, None
+            interleave()
+
+    def __getitem__(self, index):
+        self.run(index, False)
+        return self.words[index]
+
+    def __setitem__(self, index, value):
+        self.run(index, True)
+        self.words[index] = value
+
+class TestTranspositionTable(unittest.TestCase):
+
+    def test_store_and_probe(self):
+        table = TranspositionTable(size=8)
+        table.store(42, 3, 1.5, EXACT, 7)
+        entry = table.probe(42)
+        self.assertEqual(entry[1:5], (3, 1.5, EXACT, 7))
+        self.assertEqual((table.hits, table.misses, table.collisions), (1, 0, 0))
+
+    def test_collision_is_counted_not_returned(self):
+        table = TranspositionTable(size=8)
+        table.store(1, 3, 0, EXACT, None)
+        self.assertIsNone(table.probe(9))  # same slot, different key
+        self.assertIsNone(table.probe(2))
+        self.assertEqual((table.hits, table.misses, table.collisions), (0, 1, 1))
+
+    def test_depth_preferred_replacement(self):
+        table = TranspositionTable(size=8)
+        table.store(1, 5, 0, EXACT, None)
+        table.store(9, 2, 0, LOWER_BOUND, None)
+        self.assertEqual(table.probe(1)[1], 5)  # shallower entry did not evict the deeper one
+        table.new_search()
+        table.store(9, 2, 0, LOWER_BOUND, None)
+        self.assertEqual(table.probe(9)[1], 2)  # entries from an older search are replaced
+
+    def test_shared_table_is_visible_to_attached_tables(self):
+        table = SharedTranspositionTable(size=8, create=True)
+        try:
+            table.store(42, 3, float('-inf'), LOWER_BOUND, 7)
+            attached = SharedTranspositionTable(size=8, name=table.name)
+            self.assertEqual(attached.probe(42)[1:5], (3, float('-inf'), LOWER_BOUND, 7))
+            self.assertIsNone(attached.probe(50))  # same slot, different key
+            self.assertEqual(attached.collisions, 1)
+            attached.close()
+        finally:
+            table.unlink()
+
+    def test_interleaved_shared_stores_never_read_as_a_wrong_entry(self):
+        table = SharedTranspositionTable(size=8, create=True)
+        try:
+            other = SharedTranspositionTable(size=8, name=table.name)
+            words = table.words
+            # 42 and 50 share slot 2 (words 6 to 8); the other store lands between writing the value and the meta word
+            table.words = InterleavedWords(words, 8, lambda: other.store(50, 3, -7.0, EXACT, None), True)
+            table.store(42, 3, 5.0, EXACT, None)
+            table.words = words
+            self.assertIsNone(table.probe(42))
+            self.assertIsNone(table.probe(50))
+            self.assertEqual(table.collisions, 2)
+            # a store lands between reading the check word and the value word
+            table.store(42, 3, 5.0, EXACT, None)
+            other.words = InterleavedWords(other.words, 7, lambda: table.store(50, 3, -7.0, EXACT, None), False)
+            self.assertIsNone(other.probe(42))
+            self.assertEqual(other.collisions, 1)
+            other.words = other.words.words
+            other.close()
+        finally:
+            table.unlink()
+
+    def test_zobrist_hash_depends_on_whole_state(self):
+        keys = ZobristKeys(100)
+        hashes = {keys.hash_state((a, b, side), goal) for a, b, side, goal in
+                  [(1, 2, True, 0), (1, 2, False, 0), (2, 1, True, 0), (1, 2, True, 5)]}
+        self.assertEqual(len(hashes), 4)
+
+    def test_alpha_beta_searches_fewer_nodes_with_table(self):
+        random.seed(1)
+        game = TurnBasedGame(20, headless=True)
+        game.depth = 7
+        plain = GameSearch(game, tt_size=0)
+        cached = GameSearch(game)
+        plain_move = plain.get_best_move(alphaBeta=True)
+        cached_move = cached.get_best_move(alphaBeta=True)
+        self.assertEqual(plain_move, cached_move)
+        self.assertLess(cached.node_counter, plain.node_counter)
+        self.assertGreater(cached.transposition_table.hits, 0)
+
+if __name__ == '__main__':
+    unittest.main()
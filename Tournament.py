@@ -0,0 +1,195 @@
+import argparse, itertools, json, os, random, time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from Evaluators import EVALUATORS
+from GameSearch import GameSearch
+from MazeCorpus import MazeCorpus, generate_maze, maze_spec
+from MazeRunner import TurnBasedGame
+
+METHODS = ("MM", "AB", "PVS")
+
+
+def parse_engine(label):
+    """'AB:5:maze' -> {"label", "method", "depth", "evaluator"}; depth and evaluator default to 5 and manhattan."""
+    parts = label.split(":")
+    method = parts[0].upper()
+    depth = int(parts[1]) if len(parts) > 1 else 5
+    evaluator = parts[2] if len(parts) > 2 else "manhattan"
+    if method not in METHODS or evaluator not in EVALUATORS or depth < 1:
+        raise ValueError(f"bad engine {label!r}, expected method[:depth[:evaluator]]")
+    return {"label": f"{method}:{depth}:{evaluator}", "method": method, "depth": depth, "evaluator": evaluator}
+
+
+def schedule(engines, mazes):
+    """every pairing of engines on every maze, once with each engine playing max, in a fixed order.
+
+    yields (game number, maze number, max engine label, min engine label).
+    """
+    number = 0
+    for maze_number in range(mazes):
+        for first, second in itertools.combinations(engines, 2):
+            for max_engine, min_engine in ((first, second), (second, first)):
+                yield number, maze_number, max_engine, min_engine
+                number += 1
+
+
+def load_maze(maze_number, corpus, sizes, loop_percents, seed):
+    """maze maze_number of the corpus directory, or generated from its seed when there is no corpus."""
+    if corpus is not None:
+        with MazeCorpus(corpus) as mazes:
+            return mazes[maze_number]
+    return generate_maze(*maze_spec(maze_number, sizes, loop_percents, seed))
+
+
+def start_cells(game, seed):
+    """seeded (max, min) start positions, redrawn until neither is on the goal."""
+    rng = random.Random(seed)
+    starts = []
+    while len(starts) < 2:
+        position = (rng.randint(1, game.rows), rng.randint(1, game.cols))
+        if position != game.goal:
+            starts.append(position)
+    return starts
+
+
+def play_game(number, maze_number, max_engine, min_engine, settings):
+    """worker entry point: plays one ai-vs-ai game and returns its result record.
+
+    both sides get their own GameSearch, swapped in before each move, and start from
+    cells drawn from the game's own seed so a rerun replays the same game.
+    """
+    source = load_maze(maze_number, settings["corpus"], settings["sizes"], settings["loop_percents"],
+                       settings["seed"])
+    game = TurnBasedGame(headless=True, source_maze=source)
+    game.max.position, game.min.position = start_cells(game, f"{settings['seed']}:{maze_number}:start")
+    game.current_player = game.max
+
+    sides = {}
+    for name, label in (("max", max_engine), ("min", min_engine)):
+        engine = parse_engine(label)
+        search = GameSearch(game, tt_size=settings["tt_size"], evaluator=EVALUATORS[engine["evaluator"]]())
+        search.search_method = engine["method"]
+        sides[name] = {"engine": label, "depth": engine["depth"], "search": search,
+                       "moves": 0, "seconds": 0.0, "nodes": 0}
+
+    plies = 0
+    while game.winner is None and plies < settings["max_plies"]:
+        side = sides["max" if game.current_player == game.max else "min"]
+        game.game_search = side["search"]
+        game.depth = side["depth"]
+        started = time.perf_counter()
+        game.ai_move()
+        side["seconds"] += time.perf_counter() - started
+        side["moves"] += 1
+        side["nodes"] += side["search"].last_stats.nodes
+        plies += 1
+
+    winner = None if game.winner is None else "max" if game.winner == game.max else "min"
+    return {"game": number, "maze": maze_number, "winner": winner, "plies": plies,
+            **{name: {field: side[field] for field in ("engine", "moves", "seconds", "nodes")}
+               for name, side in sides.items()}}
+
+
+def read_results(path, config):
+    """the finished game records in path, checking it was written for the same config.
+
+    a missing file has none. a torn last line left by an interrupted run is cut off
+    the file, so appending can carry on after it.
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, "rb+") as handle:
+        data = handle.read()
+        complete = data.rfind(b"\n") + 1
+        handle.truncate(complete)
+    lines = data[:complete].decode().splitlines()
+    if lines and json.loads(lines[0]).get("tournament") != config:
+        raise ValueError(f"{path} holds results of a different tournament")
+    return [json.loads(line) for line in lines[1:]]
+
+
+def run_tournament(path, engines, mazes, corpus=None, sizes=((10, 10), (20, 30)), loop_percents=(0, 30, 100),
+                   seed=0, tt_size=1 << 16, max_plies=500, workers=None, log=print):
+    """plays every scheduled game not yet in path, appending one json line per finished game.
+
+    the first line of the file records the tournament settings; rerunning with the same
+    settings resumes where an interrupted run stopped. returns every result, old and new.
+    """
+    engines = [parse_engine(label)["label"] for label in engines]
+    config = {"engines": engines, "mazes": mazes, "corpus": corpus, "sizes": [list(size) for size in sizes],
+              "loop_percents": list(loop_percents), "seed": seed, "tt_size": tt_size, "max_plies": max_plies}
+    results = read_results(path, config)
+    done = {result["game"] for result in results}
+    pending = [game for game in schedule(engines, mazes) if game[0] not in done]
+    if done:
+        log(f"resuming: {len(done)} games already played, {len(pending)} to go")
+
+    with open(path, "a") as handle:
+        if not handle.tell():
+            handle.write(json.dumps({"tournament": config}) + "\n")
+            handle.flush()
+        with ProcessPoolExecutor(workers) as pool:
+            running = {pool.submit(play_game, *game, config) for game in pending}
+            while running:
+                finished, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    result = future.result()
+                    handle.write(json.dumps(result, separators=(",", ":")) + "\n")
+                    handle.flush()
+                    results.append(result)
+                    log(f"game {result['game']} maze {result['maze']}: {result['max']['engine']} vs "
+                        f"{result['min']['engine']}, {result['winner'] or 'nobody'} won in {result['plies']} plies")
+    return results
+
+
+def summarize(results):
+    """per engine: games, wins, losses, draws, win rate, move latency, nodes per move and game length."""
+    table = {}
+    for result in results:
+        for side, other in (("max", "min"), ("min", "max")):
+            row = table.setdefault(result[side]["engine"], {"games": 0, "wins": 0, "losses": 0, "draws": 0,
+                                                            "moves": 0, "seconds": 0.0, "nodes": 0, "plies": 0})
+            row["games"] += 1
+            row["wins"] += result["winner"] == side
+            row["losses"] += result["winner"] == other
+            row["draws"] += result["winner"] is None
+            row["plies"] += result["plies"]
+            for field in ("moves", "seconds", "nodes"):
+                row[field] += result[side][field]
+    summary = {}
+    for label, row in table.items():
+        moves = row["moves"] or 1
+        summary[label] = {"games": row["games"], "wins": row["wins"], "losses": row["losses"],
+                          "draws": row["draws"], "win_rate": (row["wins"] + row["draws"] / 2) / row["games"],
+                          "ms_per_move": 1000 * row["seconds"] / moves, "nodes_per_move": row["nodes"] / moves,
+                          "mean_plies": row["plies"] / row["games"]}
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="play ai-vs-ai games between engine settings on seeded mazes")
+    parser.add_argument("engines", nargs="+", help="method[:depth[:evaluator]], e.g. MM:4 AB:6:maze")
+    parser.add_argument("--mazes", type=int, default=10, help="how many mazes each pairing plays on")
+    parser.add_argument("--corpus", help="take the mazes from a MazeCorpus directory instead of generating them")
+    parser.add_argument("--sizes", nargs="+", default=["10x10", "20x30"], help="rowsxcols")
+    parser.add_argument("--loop-percents", type=int, nargs="+", default=[0, 30, 100])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tt-size", type=int, default=1 << 16, help="transposition table slots, 0 disables it")
+    parser.add_argument("--max-plies", type=int, default=500, help="games longer than this are draws")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default="tournament.jsonl", help="results file, resumed if it exists")
+    args = parser.parse_args()
+
+    if len(args.engines) < 2:
+        parser.error("need at least two engines")
+    sizes = [tuple(int(part) for part in size.split("x")) for size in args.sizes]
+    results = run_tournament(args.output, args.engines, args.mazes, args.corpus, sizes, args.loop_percents,
+                             args.seed, args.tt_size, args.max_plies, args.workers)
+    print(f"{'engine':<20} {'games':>6} {'win%':>6} {'w/l/d':>12} {'ms/move':>9} {'nodes/move':>11} {'plies':>6}")
+    for label, row in sorted(summarize(results).items(), key=lambda item: -item[1]["win_rate"]):
+        record = f"{row['wins']}/{row['losses']}/{row['draws']}"
+        print(f"{label:<20} {row['games']:>6} {row['win_rate']:>6.1%} {record:>12} {row['ms_per_move']:>9.2f} "
+              f"{row['nodes_per_move']:>11.0f} {row['mean_plies']:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
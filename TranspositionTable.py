@@ -0,0 +1,160 @@
+import random
+import struct
+
+# bound types stored with each entry
+EXACT = 0
+LOWER_BOUND = 1  # the search failed high, the true value is >= the stored value
+UPPER_BOUND = 2  # the search failed low, the true value is <= the stored value
+
+DOUBLE = struct.Struct('<d')
+BITS = struct.Struct('<Q')
+
+
+class ZobristKeys:
+    """random 64-bit keys for hashing search states.
+
+    a state (max_cell, min_cell, max_to_move) hashes to the xor of one key per
+    occupied (side, cell), a key for the side to move and a key for the goal cell,
+    so positions searched against different goals never share an entry.
+    """
+
+    def __init__(self, cell_count, seed=0):
+        rng = random.Random(seed)
+        self.max_keys = [rng.getrandbits(64) for _ in range(cell_count)]
+        self.min_keys = [rng.getrandbits(64) for _ in range(cell_count)]
+        self.goal_keys = [rng.getrandbits(64) for _ in range(cell_count)]
+        self.max_to_move = rng.getrandbits(64)
+
+    def hash_state(self, state, goal_cell):
+        return self.hash_cells(state[0], state[1], state[2], goal_cell)
+
+    def hash_cells(self, max_cell, min_cell, max_to_move, goal_cell):
+        key = self.max_keys[max_cell] ^ self.min_keys[min_cell] ^ self.goal_keys[goal_cell]
+        if max_to_move:
+            key ^= self.max_to_move
+        return key
+
+
+class TranspositionTable:
+    """fixed-size table of search results keyed by zobrist hash.
+
+    entries are tuples (key, depth, value, bound, best_move, generation). a slot is
+    replaced when it is empty, holds the same position, was written by an earlier
+    search, or holds a shallower result (depth-preferred replacement).
+    """
+
+    def __init__(self, size=1 << 16):
+        self.size = size
+        self.slots = [None] * size
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def new_search(self):
+        """ages existing entries and resets the counters for the next search."""
+        self.generation += 1
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def probe(self, key):
+        entry = self.slots[key % self.size]
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[0] != key:
+            self.collisions += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def store(self, key, depth, value, bound, best_move):
+        index = key % self.size
+        entry = self.slots[index]
+        if entry is None or entry[0] == key or entry[5] != self.generation or depth >= entry[1]:
+            self.slots[index] = (key, depth, value, bound, best_move, self.generation)
+
+    def clear(self):
+        self.slots = [None] * self.size
+        self.new_search()
+
+    def __len__(self):
+        return sum(1 for entry in self.slots if entry is not None)
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """transposition table in a multiprocessing shared memory block, shared by processes.
+
+    each entry is three 64-bit words: check, value (a double) and meta, where meta packs
+    depth (8 bits), bound (8 bits), generation (8 bits) and best_move + 1 (32 bits) and
+    check = key ^ value bits ^ meta. there is no locking: a torn write from two
+    processes fails the check and reads as a collision, never as a wrong entry. for
+    that store() builds the check from the bits it writes and probe() reads each word
+    of the entry once, so neither mixes words written by different stores.
+
+    the creating process passes create=True and must call unlink() when done; other
+    processes attach with the block's name.
+    """
+
+    ENTRY_WORDS = 3
+
+    def __init__(self, size=1 << 16, name=None, create=False):
+        from multiprocessing import shared_memory
+        self.size = size
+        nbytes = size * self.ENTRY_WORDS * 8
+        if create:
+            self.shared_memory = shared_memory.SharedMemory(name=name, create=True, size=nbytes)
+            self.shared_memory.buf[:nbytes] = bytes(nbytes)
+        else:
+            self.shared_memory = shared_memory.SharedMemory(name=name)
+        self.name = self.shared_memory.name
+        self.words = self.shared_memory.buf.cast('Q')
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def probe(self, key):
+        index = (key % self.size) * 3
+        words = self.words
+        check, bits, meta = words[index], words[index + 1], words[index + 2]
+        if not meta:
+            self.misses += 1
+            return None
+        if check ^ bits ^ meta != key:
+            self.collisions += 1
+            return None
+        self.hits += 1
+        move = (meta >> 24) - 1
+        return (key, meta & 0xff, DOUBLE.unpack(BITS.pack(bits))[0], (meta >> 8) & 0xff,
+                None if move < 0 else move, (meta >> 16) & 0xff)
+
+    def store(self, key, depth, value, bound, best_move):
+        index = (key % self.size) * 3
+        words = self.words
+        check, bits, meta = words[index], words[index + 1], words[index + 2]
+        if meta and check ^ bits ^ meta != key and \
+                (meta >> 16) & 0xff == self.generation & 0xff and depth < meta & 0xff:
+            return
+        meta = min(depth, 0xff) | bound << 8 | (self.generation & 0xff) << 16 | \
+            (0 if best_move is None else best_move + 1) << 24
+        bits = BITS.unpack(DOUBLE.pack(value))[0]
+        words[index + 1] = bits
+        words[index + 2] = meta
+        words[index] = key ^ bits ^ meta
+
+    def clear(self):
+        self.shared_memory.buf[:len(self.shared_memory.buf)] = bytes(len(self.shared_memory.buf))
+        self.new_search()
+
+    def __len__(self):
+        return sum(1 for index in range(2, self.size * 3, 3) if self.words[index])
+
+    def close(self):
+        self.words.release()
+        self.shared_memory.close()
+
+    def unlink(self):
+        self.close()
+        self.shared_memory.unlink()
@@ -21,10 +21,100 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-import random,datetime,csv,os
+import random,datetime,csv,os,mmap,struct,zlib
 from tkinter import *
 from enum import Enum
+from array import array
 from collections import deque
+from collections.abc import Mapping
+
+# Bits of maze.walls, a set bit means that side of the cell is open
+EAST,WEST,NORTH,SOUTH=1,2,4,8
+_DIRECTION_BITS={'E':EAST,'W':WEST,'N':NORTH,'S':SOUTH}
+
+# Binary maze file: this header, then the rows*cols bytes of maze.walls
+_BINARY_MAGIC=b'PYMZ'
+_BINARY_VERSION=1
+_BINARY_HEADER=struct.Struct('<4sB3xHHHHI') # magic, version, rows, cols, goal x, goal y, crc32 of walls
+
+def _unpackBinaryMaze(buffer,offset=0,name='buffer'):
+    '''
+    Reads one binary maze record from buffer at offset, returns (rows,cols,goal,walls)
+    '''
+    if buffer[offset:offset+4]!=_BINARY_MAGIC:
+        raise ValueError(f'{name} is not a binary maze')
+    magic,version,rows,cols,goalX,goalY,checksum=_BINARY_HEADER.unpack_from(buffer,offset)
+    if version!=_BINARY_VERSION:
+        raise ValueError(f'{name} has unsupported maze file version {version}')
+    start=offset+_BINARY_HEADER.size
+    walls=array('B')
+    walls.frombytes(buffer[start:start+rows*cols])
+    if len(walls)!=rows*cols or zlib.crc32(walls)!=checksum:
+        raise ValueError(f'{name} is truncated or corrupt')
+    return rows,cols,(goalX,goalY),walls
+
+def _readBinaryMaze(path):
+    '''
+    Maps a binary maze file and returns (rows,cols,goal,walls) without parsing any cell
+    '''
+    with open(path,'rb') as f, mmap.mmap(f.fileno(),0,access=mmap.ACCESS_READ) as m:
+        return _unpackBinaryMaze(m,0,path)
+
+def _isBinaryMaze(path):
+    with open(path,'rb') as f:
+        return f.read(4)==_BINARY_MAGIC
+
+def convertMaze(csvPath,binaryPath=None,goal=(1,1)):
+    '''
+    Converts a CSV maze saved by older versions into the binary format.
+    CSV files do not record the goal, so it is given here.
+    Returns the path written, csvPath with a .maze extension by default.
+    '''
+    m=maze(headless=True)
+    m.CreateMaze(*goal,loadMaze=csvPath)
+    if binaryPath is None:
+        binaryPath=os.path.splitext(csvPath)[0]+'.maze'
+    m.saveBinary(binaryPath)
+    return binaryPath
+
+class _CellWalls(Mapping):
+    '''
+    Read-only {'E','W','N','S'} view of one cell of maze.walls, 1 for open and 0 for blocked
+    '''
+    __slots__=('_walls','_index')
+    def __init__(self,walls,index):
+        self._walls=walls
+        self._index=index
+    def __getitem__(self,direction):
+        return 1 if self._walls[self._index]&_DIRECTION_BITS[direction] else 0
+    def __iter__(self):
+        return iter(_DIRECTION_BITS)
+    def __len__(self):
+        return 4
+    def __repr__(self):
+        return repr(dict(self))
+
+class _MazeMap(Mapping):
+    '''
+    Read-only view of maze.walls in the old maze_map layout: (x,y) cells mapping to
+    _CellWalls, in grid order. Kept for compatibility, the maze itself reads the bits.
+    '''
+    __slots__=('_maze',)
+    def __init__(self,parentMaze):
+        self._maze=parentMaze
+    def __getitem__(self,cell):
+        m=self._maze
+        x,y=cell
+        if not (0<x<=m.rows and 0<y<=m.cols):
+            raise KeyError(cell)
+        return _CellWalls(m.walls,(x-1)*m.cols+y-1)
+    def __contains__(self,cell):
+        m=self._maze
+        return isinstance(cell,tuple) and len(cell)==2 and 0<cell[0]<=m.rows and 0<cell[1]<=m.cols
+    def __iter__(self):
+        return iter(self._maze.grid)
+    def __len__(self):
+        return self._maze.rows*self._maze.cols
 
 class COLOR(Enum):
     '''
@@ -110,6 +200,8 @@ class agent:
     @y.setter
     def y(self,newY):
         self._y=newY
+        if self._parentMaze.headless:
+            return
         w=self._parentMaze._cell_width
         x=self.x*w-w+self._parentMaze._LabWidth
         y=self.y*w-w+self._parentMaze._LabWidth
@@ -233,17 +325,17 @@ class agent:
 
 
     def moveRight(self,event):
-        if self._parentMaze.maze_map[self.x,self.y]['E']==True:
+        if self._parentMaze.walls[self._parentMaze._cellIndex(self.x,self.y)]&EAST:
             self.y=self.y+1
     def moveLeft(self,event):
-        if self._parentMaze.maze_map[self.x,self.y]['W']==True:
+        if self._parentMaze.walls[self._parentMaze._cellIndex(self.x,self.y)]&WEST:
             self.y=self.y-1
     def moveUp(self,event):
-        if self._parentMaze.maze_map[self.x,self.y]['N']==True:
+        if self._parentMaze.walls[self._parentMaze._cellIndex(self.x,self.y)]&NORTH:
             self.x=self.x-1
             self.y=self.y
     def moveDown(self,event):
-        if self._parentMaze.maze_map[self.x,self.y]['S']==True:
+        if self._parentMaze.walls[self._parentMaze._cellIndex(self.x,self.y)]&SOUTH:
             self.x=self.x+1
             self.y=self.y
     def getPosition(self):
@@ -271,8 +363,11 @@ class textLabel:
     @value.setter
     def value(self,v):
         self._value=v
-        self._var.set(f'{self.title} : {v}')
+        if self._var is not None:
+            self._var.set(f'{self.title} : {v}')
     def drawLabel(self):
+        if self._parentMaze.headless:
+            return
         self._var = StringVar()
         self.lab = Label(self._parentMaze._canvas, textvariable=self._var, bg="white", fg="black",font=('Helvetica bold',12),relief=RIDGE)
         self._var.set(f'{self.title} : {self.value}')
@@ -282,15 +377,19 @@ class maze:
     '''
     This is the main class to create maze.
     '''
-    def __init__(self,rows=10,cols=10):
+    def __init__(self,rows=10,cols=10,headless=False):
         '''
         rows--> No. of rows of the maze
         cols--> No. of columns of the maze
+        headless--> If True, no Tkinter window is created. The maze, agents and
+                    labels are kept as pure data (useful for simulations)
         Need to pass just the two arguments. The rest will be assigned automatically
-        maze_map--> Will be set to a Dicationary. Keys will be cells and
-                    values will be another dictionary with keys=['E','W','N','S'] for
-                    East West North South and values will be 0 or 1. 0 means that 
-                    direction(EWNS) is blocked. 1 means that direction is open.
+        walls-->    array('B') with one byte per cell, indexed by (x-1)*cols+(y-1), holding
+                    the EAST|WEST|NORTH|SOUTH bits of the open sides of the cell
+        maze_map--> Read-only view of walls. Keys are cells and values behave like a
+                    dictionary with keys=['E','W','N','S'] for East West North South and
+                    values 0 or 1. 0 means that direction(EWNS) is blocked. 1 means that
+                    direction is open.
         grid--> A list of all cells
         path--> Shortest path from start(bottom right) to goal(by default top left)
                 It will be a dictionary
@@ -303,7 +402,7 @@ class maze:
         '''
         self.rows=rows
         self.cols=cols
-        self.maze_map={}
+        self.headless=headless
         self.grid=[]
         self.path={} 
         self._cell_width=50  
@@ -317,36 +416,170 @@ class maze:
         return self._grid
     @grid.setter        
     def grid(self,n):
-        self._grid=[]
-        y=0
-        for n in range(self.cols):
-            x = 1
-            y = 1+y
-            for m in range(self.rows):
-                self.grid.append((x,y))
-                self.maze_map[x,y]={'E':0,'W':0,'N':0,'S':0}
-                x = x + 1 
+        # column by column, as before, so maze_map keeps its key order; every wall closed
+        self._grid=[(x,y) for y in range(1,self.cols+1) for x in range(1,self.rows+1)]
+        self.walls=array('B',bytes(self.rows*self.cols))
+    @property
+    def maze_map(self):
+        return _MazeMap(self)
+    def _cellIndex(self,x,y):
+        return (x-1)*self.cols+y-1
     def _Open_East(self,x, y):
         '''
         To remove the East Wall of the cell
         '''
-        self.maze_map[x,y]['E']=1
+        self.walls[self._cellIndex(x,y)]|=EAST
         if y+1<=self.cols:
-            self.maze_map[x,y+1]['W']=1
+            self.walls[self._cellIndex(x,y+1)]|=WEST
     def _Open_West(self,x, y):
-        self.maze_map[x,y]['W']=1
+        self.walls[self._cellIndex(x,y)]|=WEST
         if y-1>0:
-            self.maze_map[x,y-1]['E']=1
+            self.walls[self._cellIndex(x,y-1)]|=EAST
     def _Open_North(self,x, y):
-        self.maze_map[x,y]['N']=1
+        self.walls[self._cellIndex(x,y)]|=NORTH
         if x-1>0:
-            self.maze_map[x-1,y]['S']=1
+            self.walls[self._cellIndex(x-1,y)]|=SOUTH
     def _Open_South(self,x, y):
-        self.maze_map[x,y]['S']=1
+        self.walls[self._cellIndex(x,y)]|=SOUTH
         if x+1<=self.rows:
-            self.maze_map[x+1,y]['N']=1
+            self.walls[self._cellIndex(x+1,y)]|=NORTH
     
-    def CreateMaze(self,x=1,y=1,pattern=None,loopPercent=0,saveMaze=False,loadMaze=None,theme:COLOR=COLOR.dark):
+    def _inGrid(self,x,y):
+        '''
+        Same as (x,y) in self.grid, with bounds checks instead of a list scan
+        '''
+        return 0<x<=self.rows and 0<y<=self.cols
+    def _blockedNeighbours(self,cell):
+        '''
+        Cells next to cell that are still walled off from it
+        '''
+        n=[]
+        walls=self.walls[self._cellIndex(*cell)]
+        if not walls&EAST and cell[1]<self.cols:
+            n.append((cell[0],cell[1]+1))
+        if not walls&WEST and cell[1]>1:
+            n.append((cell[0],cell[1]-1))
+        if not walls&NORTH and cell[0]>1:
+            n.append((cell[0]-1,cell[1]))
+        if not walls&SOUTH and cell[0]<self.rows:
+            n.append((cell[0]+1,cell[1]))
+        return n
+    def _removeWallinBetween(self,cell1,cell2):
+        '''
+        To remove wall in between two cells
+        '''
+        walls=self.walls
+        index1,index2=self._cellIndex(*cell1),self._cellIndex(*cell2)
+        if cell1[0]==cell2[0]:
+            if cell1[1]==cell2[1]+1:
+                walls[index1]|=WEST
+                walls[index2]|=EAST
+            else:
+                walls[index1]|=EAST
+                walls[index2]|=WEST
+        else:
+            if cell1[0]==cell2[0]+1:
+                walls[index1]|=NORTH
+                walls[index2]|=SOUTH
+            else:
+                walls[index1]|=SOUTH
+                walls[index2]|=NORTH
+    def _isCyclic(self,cell1,cell2):
+        '''
+        To avoid too much blank(clear) path.
+        '''
+        ans=False
+        walls=self.walls
+        def isOpen(x,y,bit):
+            return self._inGrid(x,y) and walls[self._cellIndex(x,y)]&bit
+        if cell1[0]==cell2[0]:
+            if cell1[1]>cell2[1]: cell1,cell2=cell2,cell1
+            if isOpen(*cell1,SOUTH) and isOpen(*cell2,SOUTH) and isOpen(cell1[0]+1,cell1[1],EAST):
+                ans= True
+            if isOpen(*cell1,NORTH) and isOpen(*cell2,NORTH) and isOpen(cell1[0]-1,cell1[1],EAST):
+                ans= True
+        else:
+            if cell1[0]>cell2[0]: cell1,cell2=cell2,cell1
+            if isOpen(*cell1,EAST) and isOpen(*cell2,EAST) and isOpen(cell1[0],cell1[1]+1,SOUTH):
+                ans= True
+            if isOpen(*cell1,WEST) and isOpen(*cell2,WEST) and isOpen(cell1[0],cell1[1]-1,SOUTH):
+                ans= True
+        return ans
+    def _agentPath(self,cell):
+        '''
+        Agent Path
+        This will be used only when there are multiple paths (loopPercent>0) or
+        Maze is loaded from a CSV file.
+        If a perfect maze is generated and without the load file, this method will
+        not be used since the Maze generation will calculate the path.
+        '''
+        # breadth-first from cell, stopping once the goal is reached: every cell on the
+        # goal's parent chain was discovered before it, so the chain is already complete
+        frontier = deque()
+        frontier.append(cell)
+        path = {}
+        visited = {(self.rows,self.cols)}
+        goal=self._goal
+        cols=self.cols
+        while frontier and goal not in visited:
+            cell = frontier.popleft()
+            walls=self.walls[(cell[0]-1)*cols+cell[1]-1]
+            for bit,nextCell in ((WEST,(cell[0],cell[1]-1)),(SOUTH,(cell[0]+1,cell[1])),
+                                 (EAST,(cell[0],cell[1]+1)),(NORTH,(cell[0]-1,cell[1]))):
+                if walls&bit and nextCell not in visited:
+                    path[nextCell] = cell
+                    frontier.append(nextCell)
+                    visited.add(nextCell)
+        fwdPath={}
+        cell=self._goal
+        while cell!=(self.rows,self.cols):
+            try:
+                fwdPath[path[cell]]=cell
+                cell=path[cell]
+            except:
+                print('Path to goal not found!')
+                return
+        return fwdPath
+    def addLoops(self,loopPercent,rng=None):
+        '''
+        Removes extra walls to put loops into the maze, as CreateMaze does for loopPercent.
+        Works on any maze, e.g. one loaded from a file, so loop-density variants of a maze
+        can be made without generating it again. path is recomputed afterwards.
+        A drawn maze is not redrawn, so call this before the window is shown.
+        loopPercent-->  0 to 100, higher means more loops
+        rng-->  random.Random to draw from instead of the global random state
+        '''
+        if rng is None:
+            rng=random
+        # the walk starts at the bottom-right corner and ends there at once, so that corner
+        # is the only cell treated as on the path; kept as is so seeded mazes do not change
+        x,y=self.rows,self.cols
+        pathCells=[(x,y)]
+        while x!=self.rows or y!=self.cols:
+            x,y=self.path[(x,y)]
+            pathCells.append((x,y))
+        onPath=set(pathCells)
+        notPathCells=[i for i in self.grid if i not in onPath]
+        rng.shuffle(pathCells)
+        rng.shuffle(notPathCells)
+        pathLength=len(pathCells)
+        notPathLength=len(notPathCells)
+        count1,count2=pathLength/3*loopPercent/100,notPathLength/3*loopPercent/100
+        #remove blocks from shortest path cells, then from the ones outside it
+        for cells,target in ((pathCells,count1),(notPathCells,count2)):
+            count=0
+            for cell in cells:
+                if count>=target: #these many blocks to remove
+                    break
+                blocked=self._blockedNeighbours(cell)
+                if blocked:
+                    neighbour=rng.choice(blocked)
+                    if not self._isCyclic(neighbour,cell):
+                        self._removeWallinBetween(neighbour,cell)
+                        count+=1
+        self.path=self._agentPath((self.rows,self.cols))
+    
+    def CreateMaze(self,x=1,y=1,pattern=None,loopPercent=0,saveMaze=False,loadMaze=None,theme:COLOR=COLOR.dark,rng=None):
         '''
         One very important function to create a Random Maze
         pattern-->  It can be 'v' for vertical or 'h' for horizontal
@@ -355,12 +588,17 @@ class maze:
         loopPercent-->  0 means there will be just one path from start to goal (perfect maze)
                         Higher value means there will be multiple paths (loops)
                         Higher the value (max 100) more will be the loops
-        saveMaze--> To save the generated Maze as CSV file for future reference.
-        loadMaze--> Provide the CSV file to generate a desried maze
+        saveMaze--> To save the generated Maze as a binary .maze file for future reference.
+        loadMaze--> Provide a .maze file (or an old CSV file) to generate a desried maze.
+                    A .maze file brings its own goal, x and y are ignored.
         theme--> Dark or Light
+        rng-->  random.Random to draw from instead of the global random state, so
+                mazes can be generated from independent seeds (e.g. one per task)
         '''
+        if rng is None:
+            rng=random
         _stack=[]
-        _closed=[]
+        _closed=set()
         self.theme=theme
         self._goal=(x,y)
         if(isinstance(theme,str)):
@@ -368,250 +606,159 @@ class maze:
                 self.theme=COLOR[theme]
             else:
                 raise ValueError(f'{theme} is not a valid theme COLOR!')
-        def blockedNeighbours(cell):
-            n=[]
-            for d in self.maze_map[cell].keys():
-                if self.maze_map[cell][d]==0:
-                    if d=='E' and (cell[0],cell[1]+1) in self.grid:
-                        n.append((cell[0],cell[1]+1))
-                    elif d=='W' and (cell[0],cell[1]-1) in self.grid:
-                        n.append((cell[0],cell[1]-1))
-                    elif d=='N' and (cell[0]-1,cell[1]) in self.grid:
-                        n.append((cell[0]-1,cell[1]))
-                    elif d=='S' and (cell[0]+1,cell[1]) in self.grid:
-                        n.append((cell[0]+1,cell[1]))
-            return n
-        def removeWallinBetween(cell1,cell2):
-            '''
-            To remove wall in between two cells
-            '''
-            if cell1[0]==cell2[0]:
-                if cell1[1]==cell2[1]+1:
-                    self.maze_map[cell1]['W']=1
-                    self.maze_map[cell2]['E']=1
-                else:
-                    self.maze_map[cell1]['E']=1
-                    self.maze_map[cell2]['W']=1
-            else:
-                if cell1[0]==cell2[0]+1:
-                    self.maze_map[cell1]['N']=1
-                    self.maze_map[cell2]['S']=1
-                else:
-                    self.maze_map[cell1]['S']=1
-                    self.maze_map[cell2]['N']=1
-        def isCyclic(cell1,cell2):
-            '''
-            To avoid too much blank(clear) path.
-            '''
-            ans=False
-            if cell1[0]==cell2[0]:
-                if cell1[1]>cell2[1]: cell1,cell2=cell2,cell1
-                if self.maze_map[cell1]['S']==1 and self.maze_map[cell2]['S']==1:
-                    if (cell1[0]+1,cell1[1]) in self.grid and self.maze_map[(cell1[0]+1,cell1[1])]['E']==1:
-                        ans= True
-                if self.maze_map[cell1]['N']==1 and self.maze_map[cell2]['N']==1:
-                    if (cell1[0]-1,cell1[1]) in self.grid and self.maze_map[(cell1[0]-1,cell1[1])]['E']==1:
-                        ans= True
-            else:
-                if cell1[0]>cell2[0]: cell1,cell2=cell2,cell1
-                if self.maze_map[cell1]['E']==1 and self.maze_map[cell2]['E']==1:
-                    if (cell1[0],cell1[1]+1) in self.grid and self.maze_map[(cell1[0],cell1[1]+1)]['S']==1:
-                        ans= True
-                if self.maze_map[cell1]['W']==1 and self.maze_map[cell2]['W']==1:
-                    if (cell1[0],cell1[1]-1) in self.grid and self.maze_map[(cell1[0],cell1[1]-1)]['S']==1:
-                        ans= True
-            return ans
-        def AS(cell):
-            '''
-            Agent Path
-            This will be used only when there are multiple paths (loopPercent>0) or
-            Maze is loaded from a CSV file.
-            If a perfect maze is generated and without the load file, this method will
-            not be used since the Maze generation will calculate the path.
-            '''
-            frontier = deque()
-            frontier.append(cell)
-            path = {}
-            visited = {(self.rows,self.cols)}
-            while len(frontier) > 0:
-                cell = frontier.popleft()
-                if self.maze_map[cell]['W'] and (cell[0],cell[1]-1) not in visited:
-                    nextCell = (cell[0],cell[1]-1)
-                    path[nextCell] = cell
-                    frontier.append(nextCell)
-                    visited.add(nextCell)
-                if self.maze_map[cell]['S'] and (cell[0]+1,cell[1]) not in visited:    
-                    nextCell = (cell[0]+1,cell[1])
-                    path[nextCell] = cell
-                    frontier.append(nextCell)
-                    visited.add(nextCell)
-                if self.maze_map[cell]['E'] and (cell[0],cell[1]+1) not in visited:
-                    nextCell = (cell[0],cell[1]+1)
-                    path[nextCell] = cell
-                    frontier.append(nextCell)
-                    visited.add(nextCell)
-                if self.maze_map[cell]['N'] and (cell[0]-1,cell[1]) not in visited:
-                    nextCell = (cell[0]-1,cell[1])
-                    path[nextCell] = cell
-                    frontier.append(nextCell)
-                    visited.add(nextCell)
-            fwdPath={}
-            cell=self._goal
-            while cell!=(self.rows,self.cols):
-                try:
-                    fwdPath[path[cell]]=cell
-                    cell=path[cell]
-                except:
-                    print('Path to goal not found!')
-                    return
-            return fwdPath
+        rows,cols=self.rows,self.cols
         # if maze is to be generated randomly
         if not loadMaze:
+            # visited cells live in a bytearray over the grid padded by one cell on every
+            # side, with the padding marked visited, so checking a neighbour is a single
+            # index and no bounds test; the whole backtracker is linear in the cell count
+            width=cols+2
+            _closed=bytearray(width*(rows+2))
+            for i in range(width):
+                _closed[i]=_closed[(rows+1)*width+i]=1
+            for i in range(rows+2):
+                _closed[i*width]=_closed[i*width+cols+1]=1
+            walls=self.walls
+            path=self.path
+            choice=rng.choice
             _stack.append((x,y))
-            _closed.append((x,y))
+            index=x*width+y
+            _closed[index]=1
+            pattern=pattern.lower() if pattern is not None else None
             biasLength=2 # if pattern is 'v' or 'h'
-            if(pattern is not None and pattern.lower()=='h'):
+            if(pattern=='h'):
                 biasLength=max(self.cols//10,2)
-            if(pattern is not None and pattern.lower()=='v'):
+            if(pattern=='v'):
                 biasLength=max(self.rows//10,2)
             bias=0
 
-            while len(_stack) > 0:
-                cell = []
+            while _stack:
                 bias+=1
-                if(x , y +1) not in _closed and (x , y+1) in self.grid:
+                if _closed[index+1] and _closed[index-1] and _closed[index+width] and _closed[index-width]:
+                    # dead end, backtrack
+                    x, y = _stack.pop()
+                    index=x*width+y
+                    continue
+                cell = []
+                if not _closed[index+1]:
                     cell.append("E")
-                if (x , y-1) not in _closed and (x , y-1) in self.grid:
+                if not _closed[index-1]:
                     cell.append("W")
-                if (x+1, y ) not in _closed and (x+1 , y ) in self.grid:
+                if not _closed[index+width]:
                     cell.append("S")
-                if (x-1, y ) not in _closed and (x-1 , y) in self.grid:
+                if not _closed[index-width]:
                     cell.append("N") 
-                if len(cell) > 0:    
-                    if pattern is not None and pattern.lower()=='h' and bias<=biasLength:
-                        if('E' in cell or 'W' in cell):
-                            if 'S' in cell:cell.remove('S')
-                            if 'N' in cell:cell.remove('N')
-                    elif pattern is not None and pattern.lower()=='v' and bias<=biasLength:
-                        if('N' in cell or 'S' in cell):
-                            if 'E' in cell:cell.remove('E')
-                            if 'W' in cell:cell.remove('W')
-                    else:
-                        bias=0
-                    current_cell = (random.choice(cell))
-                    if current_cell == "E":
-                        self._Open_East(x,y)
-                        self.path[x, y+1] = x, y
-                        y = y + 1
-                        _closed.append((x, y))
-                        _stack.append((x, y))
-
-                    elif current_cell == "W":
-                        self._Open_West(x, y)
-                        self.path[x , y-1] = x, y
-                        y = y - 1
-                        _closed.append((x, y))
-                        _stack.append((x, y))
-
-                    elif current_cell == "N":
-                        self._Open_North(x, y)
-                        self.path[(x-1 , y)] = x, y
-                        x = x - 1
-                        _closed.append((x, y))
-                        _stack.append((x, y))
-
-                    elif current_cell == "S":
-                        self._Open_South(x, y)
-                        self.path[(x+1 , y)] = x, y
-                        x = x + 1
-                        _closed.append((x, y))
-                        _stack.append((x, y))
-
+                if pattern=='h' and bias<=biasLength:
+                    if('E' in cell or 'W' in cell):
+                        if 'S' in cell:cell.remove('S')
+                        if 'N' in cell:cell.remove('N')
+                elif pattern=='v' and bias<=biasLength:
+                    if('N' in cell or 'S' in cell):
+                        if 'E' in cell:cell.remove('E')
+                        if 'W' in cell:cell.remove('W')
                 else:
-                    x, y = _stack.pop()
+                    bias=0
+                current_cell = (choice(cell))
+                previous = x, y
+                # same as _Open_East etc., the neighbour is always inside the grid here
+                wallIndex=(x-1)*cols+y-1
+                if current_cell == "E":
+                    walls[wallIndex]|=EAST
+                    walls[wallIndex+1]|=WEST
+                    y = y + 1
+                    index+=1
+                elif current_cell == "W":
+                    walls[wallIndex]|=WEST
+                    walls[wallIndex-1]|=EAST
+                    y = y - 1
+                    index-=1
+                elif current_cell == "N":
+                    walls[wallIndex]|=NORTH
+                    walls[wallIndex-cols]|=SOUTH
+                    x = x - 1
+                    index-=width
+                else:
+                    walls[wallIndex]|=SOUTH
+                    walls[wallIndex+cols]|=NORTH
+                    x = x + 1
+                    index+=width
+                path[x,y]=previous
+                _closed[index]=1
+                _stack.append((x, y))
 
             ## Multiple Path Loops
             if loopPercent!=0:
-                
-                x,y=self.rows,self.cols
-                pathCells=[(x,y)]
-                while x!=self.rows or y!=self.cols:
-                    x,y=self.path[(x,y)]
-                    pathCells.append((x,y))
-                notPathCells=[i for i in self.grid if i not in pathCells]
-                random.shuffle(pathCells)
-                random.shuffle(notPathCells)
-                pathLength=len(pathCells)
-                notPathLength=len(notPathCells)
-                count1,count2=pathLength/3*loopPercent/100,notPathLength/3*loopPercent/100
-                
-                #remove blocks from shortest path cells
-                count=0
-                i=0
-                while count<count1: #these many blocks to remove
-                    if len(blockedNeighbours(pathCells[i]))>0:
-                        cell=random.choice(blockedNeighbours(pathCells[i]))
-                        if not isCyclic(cell,pathCells[i]):
-                            removeWallinBetween(cell,pathCells[i])
-                            count+=1
-                        i+=1
-                            
-                    else:
-                        i+=1
-                    if i==len(pathCells):
-                        break
-                #remove blocks from outside shortest path cells
-                if len(notPathCells)>0:
-                    count=0
-                    i=0
-                    while count<count2: #these many blocks to remove
-                        if len(blockedNeighbours(notPathCells[i]))>0:
-                            cell=random.choice(blockedNeighbours(notPathCells[i]))
-                            if not isCyclic(cell,notPathCells[i]):
-                                removeWallinBetween(cell,notPathCells[i])
-                                count+=1
-                            i+=1
-                                
-                        else:
-                            i+=1
-                        if i==len(notPathCells):
-                            break
-                self.path=AS((self.rows,self.cols))
+                self.addLoops(loopPercent,rng)
         else:
-            # Load maze from CSV file
-            with open(loadMaze,'r') as f:
-                last=list(f.readlines())[-1]
-                c=last.split(',')
-                c[0]=int(c[0].lstrip('"('))
-                c[1]=int(c[1].rstrip(')"'))
-                self.rows=c[0]
-                self.cols=c[1]
+            if _isBinaryMaze(loadMaze):
+                self.rows,self.cols,self._goal,walls=_readBinaryMaze(loadMaze)
                 self.grid=[]
+                self.walls=walls
+            else:
+                # Load maze from CSV file
+                with open(loadMaze,'r') as f:
+                    last=list(f.readlines())[-1]
+                    c=last.split(',')
+                    c[0]=int(c[0].lstrip('"('))
+                    c[1]=int(c[1].rstrip(')"'))
+                    self.rows=c[0]
+                    self.cols=c[1]
+                    self.grid=[]
 
-            with open(loadMaze,'r') as f:
-                r=csv.reader(f)
-                next(r)
-                for i in r:
-                    c=i[0].split(',')
-                    c[0]=int(c[0].lstrip('('))
-                    c[1]=int(c[1].rstrip(')'))
-                    self.maze_map[tuple(c)]={'E':int(i[1]),'W':int(i[2]),'N':int(i[3]),'S':int(i[4])}
-            self.path=AS((self.rows,self.cols))
-        self._drawMaze(self.theme)
+                with open(loadMaze,'r') as f:
+                    r=csv.reader(f)
+                    next(r)
+                    for i in r:
+                        c=i[0].split(',')
+                        c[0]=int(c[0].lstrip('('))
+                        c[1]=int(c[1].rstrip(')'))
+                        self.walls[self._cellIndex(*c)]=EAST*int(i[1])|WEST*int(i[2])|NORTH*int(i[3])|SOUTH*int(i[4])
+            self.path=self._agentPath((self.rows,self.cols))
+        if not self.headless:
+            self._drawMaze(self.theme)
         agent(self,*self._goal,shape='square',filled=True,color=COLOR.green)
         if saveMaze:
             dt_string = datetime.datetime.now().strftime("%Y-%m-%d--%H-%M-%S")
-            with open(f'maze--{dt_string}.csv','w',newline='') as f:
-                writer=csv.writer(f)
-                writer.writerow(['  cell  ','E','W','N','S'])
-                for k,v in self.maze_map.items():
-                    entry=[k]
-                    for i in v.values():
-                        entry.append(i)
-                    writer.writerow(entry)
-                f.seek(0, os.SEEK_END)
-                f.seek(f.tell()-2, os.SEEK_SET)
-                f.truncate()
+            self.saveBinary(f'maze--{dt_string}.maze')
+
+    def saveBinary(self,path):
+        '''
+        Writes the maze as a binary .maze file: a header with rows, cols, goal and a
+        checksum, followed by the wall bitmask
+        '''
+        with open(path,'wb') as f:
+            f.write(self.toBytes())
+
+    def toBytes(self):
+        '''
+        The maze as one binary maze record, the contents of a .maze file
+        '''
+        return _BINARY_HEADER.pack(_BINARY_MAGIC,_BINARY_VERSION,self.rows,self.cols,
+                                   *self._goal,zlib.crc32(self.walls))+self.walls.tobytes()
+
+    @classmethod
+    def fromBinary(cls,path,headless=True):
+        '''
+        Loads a .maze file without drawing, computing the path or creating the goal
+        agent, for bulk loading. path stays empty.
+        '''
+        return cls._fromRecord(_readBinaryMaze(path),headless)
+
+    @classmethod
+    def fromBytes(cls,buffer,offset=0,headless=True):
+        '''
+        Like fromBinary, for a record inside a bytes-like object such as an mmap
+        '''
+        return cls._fromRecord(_unpackBinaryMaze(buffer,offset),headless)
+
+    @classmethod
+    def _fromRecord(cls,record,headless):
+        rows,cols,goal,walls=record
+        m=cls(rows,cols,headless=headless)
+        m.walls=walls
+        m._goal=goal
+        m.theme=COLOR.dark
+        return m
     
     def _drawMaze(self,theme):
         '''
@@ -649,16 +796,17 @@ class maze:
             if self.grid is not None:
                 for cell in self.grid:
                     x,y=cell
+                    walls=self.walls[self._cellIndex(x,y)]
                     w=self._cell_width
                     x=x*w-w+self._LabWidth
                     y=y*w-w+self._LabWidth
-                    if self.maze_map[cell]['E']==False:
+                    if not walls&EAST:
                         l=self._canvas.create_line(y + w, x, y + w, x + w,width=2,fill=theme.value[1],tag='line')
-                    if self.maze_map[cell]['W']==False:
+                    if not walls&WEST:
                         l=self._canvas.create_line(y, x, y, x + w,width=2,fill=theme.value[1],tag='line')
-                    if self.maze_map[cell]['N']==False:
+                    if not walls&NORTH:
                         l=self._canvas.create_line(y, x, y + w, x,width=2,fill=theme.value[1],tag='line')
-                    if self.maze_map[cell]['S']==False:
+                    if not walls&SOUTH:
                         l=self._canvas.create_line(y, x + w, y + w, x + w,width=2,fill=theme.value[1],tag='line')
 
     def _redrawCell(self,x,y,theme):
@@ -668,16 +816,16 @@ class maze:
         So the cell is redrawn so that cell lines are on top
         '''
         w=self._cell_width
-        cell=(x,y)
+        walls=self.walls[self._cellIndex(x,y)]
         x=x*w-w+self._LabWidth
         y=y*w-w+self._LabWidth
-        if self.maze_map[cell]['E']==False:
+        if not walls&EAST:
             self._canvas.create_line(y + w, x, y + w, x + w,width=2,fill=theme.value[1])
-        if self.maze_map[cell]['W']==False:
+        if not walls&WEST:
             self._canvas.create_line(y, x, y, x + w,width=2,fill=theme.value[1])
-        if self.maze_map[cell]['N']==False:
+        if not walls&NORTH:
             self._canvas.create_line(y, x, y + w, x,width=2,fill=theme.value[1])
-        if self.maze_map[cell]['S']==False:
+        if not walls&SOUTH:
             self._canvas.create_line(y, x + w, y + w, x + w,width=2,fill=theme.value[1])
 
     def enableArrowKey(self,a):
@@ -893,4 +1041,6 @@ class maze:
         '''
         Finally to run the Tkinter Main Loop
         '''
+        if self.headless:
+            return
         self._win.mainloop()